@@ -1,3 +1,7 @@
+import functools
+import os
+from pathlib import Path
+
 import isce3
 import numpy as np
 from dolphin import baseline
@@ -72,8 +76,8 @@ def compute_baselines(
     wavelength = get_radar_wavelength(h5file_ref)
     side = isce3.core.LookSide.Right
 
-    orbit_ref = get_cslc_orbit(h5file_ref)
-    orbit_sec = get_cslc_orbit(h5file_sec)
+    orbit_ref = _get_cslc_orbit_cached(h5file_ref)
+    orbit_sec = _get_cslc_orbit_cached(h5file_sec)
 
     baselines = []
     for lon, lat in zip(lon_arr, lat_arr):
@@ -112,22 +116,35 @@ def compute_baselines(
     return np.array(baselines).reshape(lon_grid.shape)
 
 
-def _interpolate_data(
-    data: np.ndarray, shape: tuple[int, int], method="linear"
-) -> np.ndarray:
-    from scipy.interpolate import RegularGridInterpolator
+def _get_cslc_orbit_cached(h5file: Filename) -> isce3.core.Orbit:
+    """Get the orbit of a CSLC, parsing each file only once per process.
+
+    The same reference CSLC is used for every product in a run.
+    """
+    path = os.fspath(h5file)
+    return _load_cslc_orbit(path, Path(path).stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_cslc_orbit(h5file: str, _mtime: float) -> isce3.core.Orbit:
+    # `_mtime` is only part of the cache key, so modified files are re-read
+    return get_cslc_orbit(h5file)
 
-    # Create coordinate arrays for the original data
-    orig_coords = [np.linspace(0, 1, s) for s in data.shape]
 
-    # Create coordinate arrays for the desired output shape
-    new_coords = [np.linspace(0, 1, s) for s in shape]
+def _interpolate_data(data: np.ndarray, shape: tuple[int, int]) -> np.ndarray:
+    """Bilinearly resample the (smooth, coarse) `data` grid to `shape` as float32.
 
-    # Create the interpolator
-    interp = RegularGridInterpolator(orig_coords, data, method=method)
+    The corner pixels of the input and output grids are aligned, matching a
+    linear `RegularGridInterpolator` over `linspace(0, 1, n)` coordinates.
+    """
+    from scipy import ndimage
 
-    # Create a mesh grid for the new coordinates
-    mesh = np.meshgrid(*new_coords, indexing="xy")
+    data = np.asarray(data, dtype=np.float32)
+    if data.shape == tuple(shape):
+        return data
 
-    # Perform the interpolation
-    return interp(np.array(mesh).T.astype("float32"))
+    # Passing `output` fixes the output shape; zoom factors are derived from it
+    out = np.empty(shape, dtype=np.float32)
+    zoom = [s_out / s_in for s_out, s_in in zip(shape, data.shape)]
+    ndimage.zoom(data, zoom=zoom, output=out, order=1, prefilter=False)
+    return out
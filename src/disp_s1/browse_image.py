@@ -15,17 +15,51 @@ from .product_info import DISPLACEMENT_PRODUCTS
 DEFAULT_CMAP = cmap.Colormap("vik").to_mpl()
 
 
-def _resize_to_max_pixel_dim(arr: ArrayLike, max_dim_allowed=2048) -> np.ndarray:
-    """Scale shape of a given array."""
+def _resize_to_max_pixel_dim(
+    arr: np.ndarray,
+    max_dim_allowed=2048,
+    input_shape: tuple[int, int] | None = None,
+) -> np.ndarray:
+    """Scale shape of a given array.
+
+    If `arr` was already reduced from a larger array, pass the original shape as
+    `input_shape`: the output shape is computed from it, not from `arr.shape`.
+    """
     if max_dim_allowed < 1:
         raise ValueError(f"{max_dim_allowed} is not a valid max image dimension")
-    input_shape = arr.shape
+    if input_shape is None:
+        input_shape = arr.shape
     scaling_ratio = max([max_dim_allowed / xy for xy in input_shape])
+    output_shape = tuple(round(s * scaling_ratio) for s in input_shape)
+    zoom = [s_out / s_in for s_out, s_in in zip(output_shape, arr.shape)]
     nan_mask = np.isnan(arr)
     arr[nan_mask] = 0
-    arr = ndimage.zoom(arr, scaling_ratio)
-    arr[ndimage.zoom(nan_mask, scaling_ratio, order=0)] = np.nan
-    return arr
+    # Passing `output` fixes the output shape; zoom factors are derived from it
+    out = np.empty(output_shape, dtype=arr.dtype)
+    ndimage.zoom(arr, zoom, output=out)
+    out_nan_mask = np.empty(output_shape, dtype=bool)
+    ndimage.zoom(nan_mask, zoom, output=out_nan_mask, order=0)
+    out[out_nan_mask] = np.nan
+    return out
+
+
+def _block_mean(arr: np.ndarray, valid: np.ndarray, block: int) -> np.ndarray:
+    """Average the `valid` pixels in each `block` x `block` tile of `arr`.
+
+    Edge tiles may be smaller. Tiles with no valid pixels are set to NaN.
+    """
+    row_starts = np.arange(0, arr.shape[0], block)
+    col_starts = np.arange(0, arr.shape[1], block)
+
+    def _block_sum(a: np.ndarray, dtype: type) -> np.ndarray:
+        rows_summed = np.add.reduceat(a, row_starts, axis=0, dtype=dtype)
+        return np.add.reduceat(rows_summed, col_starts, axis=1, dtype=dtype)
+
+    sums = _block_sum(np.where(valid, arr, 0), np.float64)
+    counts = _block_sum(valid, np.int64)
+    out = np.full(sums.shape, np.nan, dtype=np.float32)
+    np.divide(sums, counts, out=out, where=counts > 0, casting="unsafe")
+    return out
 
 
 def _save_to_disk_as_color(
@@ -45,8 +79,15 @@ def make_browse_image_from_arr(
     vmax: float = 0.10,
 ) -> None:
     """Create a PNG browse image for the output product from given array."""
-    arr[mask == 0] = np.nan
-    arr = _resize_to_max_pixel_dim(arr, max_dim_allowed)
+    # Average integer-sized blocks first, so the spline zoom only processes about
+    # as many pixels as end up in the image (and small features don't alias).
+    # (The smallest dimension is what gets resized to `max_dim_allowed`.)
+    arr = np.asarray(arr)
+    input_shape = arr.shape
+    block = max(1, min(input_shape) // max(max_dim_allowed, 1))
+    valid = (np.asarray(mask) != 0) & ~np.isnan(arr)
+    arr = _block_mean(arr, valid, block)
+    arr = _resize_to_max_pixel_dim(arr, max_dim_allowed, input_shape=input_shape)
     _save_to_disk_as_color(arr, output_filename, cmap, vmin, vmax)
 
 
@@ -3,11 +3,20 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import json
-from collections.abc import Sequence
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any, ClassVar, List, Optional, Union
 
+import numpy as np
+
+# Note: the dolphin/opera_utils imports are needed to define the pydantic fields
+# below, so they can't be deferred into `to_workflow`/`from_workflow`. Instead,
+# the CLI defers importing this module until a workflow is actually run.
 from dolphin.workflows.config import (
     CorrectionOptions,
     DisplacementWorkflow,
@@ -23,16 +32,36 @@ from dolphin.workflows.config._common import _read_file_list_or_glob
 from dolphin.workflows.config._yaml_model import YamlModel
 from opera_utils import (
     OPERA_DATASET_NAME,
+    get_burst_id,
     get_burst_ids_for_frame,
     get_dates,
     get_frame_bbox,
-    group_by_burst,
     sort_files_by_date,
 )
-from pydantic import ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from .enums import ProcessingMode
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+# OPERA CSLC (and compressed CSLC) names contain the sensing date as `_YYYYMMDDT`
+_OPERA_DATE_REGEX = re.compile(r"_(\d{8})T")
+
+# OPERA-specific options which always override dolphin's defaults
+_FIXED_OUTPUT_OVERRIDES = {
+    # Always turn off overviews (won't be saved in the HDF5 anyway)
+    "add_overviews": False,
+}
+_FIXED_TIMESERIES_OVERRIDES = {
+    # Always turn off velocity (not used) in output product
+    "run_velocity": False,
+    # Always use L1 minimization for inverting unwrapped networks
+    "method": "L1",
+}
+
 
 class InputFileGroup(YamlModel):
     """Inputs for A group of input files."""
@@ -50,9 +79,13 @@ class InputFileGroup(YamlModel):
         extra="forbid", json_schema_extra={"required": ["cslc_file_list", "frame_id"]}
     )
 
-    _check_cslc_file_glob = field_validator("cslc_file_list", mode="before")(
-        _read_file_list_or_glob
-    )
+    @field_validator("cslc_file_list", mode="before")
+    @classmethod
+    def _check_cslc_file_glob(cls, value):
+        # Lists of `Path`s need no glob/text file parsing
+        if isinstance(value, list) and all(isinstance(v, Path) for v in value):
+            return value
+        return _read_file_list_or_glob(cls, value)
 
 
 class DynamicAncillaryFileGroup(YamlModel):
@@ -278,38 +311,35 @@ class RunConfig(YamlModel):
         frame_id = self.input_file_group.frame_id
 
         # Load the algorithm parameters from the file
-        algorithm_parameters = AlgorithmParameters.from_yaml(
-            self.dynamic_ancillary_file_group.algorithm_parameters_file,
+        algorithm_parameters = load_algorithm_parameters(
+            self.dynamic_ancillary_file_group.algorithm_parameters_file
         )
         new_parameters = _override_parameters(algorithm_parameters, frame_id=frame_id)
-        # regenerate to ensure all defaults remained in updated version
-        param_dict = AlgorithmParameters(**new_parameters.model_dump()).model_dump()
+        # `_override_parameters` returns a validated model, so all defaults are set
+        param_dict = new_parameters.model_dump()
 
         # Convert the frame_id into an output bounding box
         frame_to_burst_file = self.static_ancillary_file_group.frame_to_burst_json
-        bounds_epsg, bounds = get_frame_bbox(
-            frame_id=frame_id, json_file=frame_to_burst_file
-        )
+        if frame_to_burst_file is not None:
+            json_key = (
+                os.fspath(frame_to_burst_file),
+                Path(frame_to_burst_file).stat().st_mtime,
+            )
+        else:
+            json_key = (None, None)
+        bounds_epsg, bounds = _cached_frame_bbox(*json_key, frame_id)
 
         # Check for consistency of frame and burst ids
-        frame_burst_ids = set(
-            get_burst_ids_for_frame(frame_id=frame_id, json_file=frame_to_burst_file)
-        )
-        data_burst_ids = set(group_by_burst(cslc_file_list).keys())
-        mismatched_bursts = data_burst_ids - frame_burst_ids
-        if mismatched_bursts:
+        frame_burst_ids = _cached_burst_ids(*json_key, frame_id)
+        if any(get_burst_id(f) not in frame_burst_ids for f in cslc_file_list):
             raise ValueError("The CSLC data and frame id do not match")
 
         # Setup the OPERA-specific options to adjust from dolphin's defaults
         input_options = {"subdataset": param_dict.pop("subdataset")}
-        param_dict["output_options"]["bounds"] = bounds
-        param_dict["output_options"]["bounds_epsg"] = bounds_epsg
-        # Always turn off overviews (won't be saved in the HDF5 anyway)
-        param_dict["output_options"]["add_overviews"] = False
-        # Always turn off velocity (not used) in output product
-        param_dict["timeseries_options"]["run_velocity"] = False
-        # Always use L1 minimization for inverting unwrapped networks
-        param_dict["timeseries_options"]["method"] = "L1"
+        param_dict["output_options"].update(
+            bounds=bounds, bounds_epsg=bounds_epsg, **_FIXED_OUTPUT_OVERRIDES
+        )
+        param_dict["timeseries_options"].update(_FIXED_TIMESERIES_OVERRIDES)
 
         # Get the current set of expected reference dates
         reference_datetimes = _parse_reference_date_json(
@@ -364,41 +394,52 @@ class RunConfig(YamlModel):
 
         This is can be used as preliminary setup to further edit the fields, or as a
         complete conversion.
+
+        Since the values taken from `workflow` have already been validated, the
+        sub-models are created with `model_construct` to skip re-validation.
         """
         if output_directory is None:
             # Take the output as one above the scratch
             output_directory = workflow.work_directory.parent / "output"
-
-        # Load the algorithm parameters from the file
-        algo_keys = set(AlgorithmParameters.model_fields.keys())
-        alg_param_dict = workflow.model_dump(include=algo_keys)
-        AlgorithmParameters(**alg_param_dict).to_yaml(algorithm_parameters_file)
+        output_directory = Path(output_directory)
+        algorithm_parameters_file = Path(algorithm_parameters_file)
+
+        # Save the algorithm parameters to the file
+        # The sub-models on `workflow` are already validated: reuse them directly
+        alg_params = {
+            k: getattr(workflow, k)
+            for k in AlgorithmParameters.model_fields
+            if k in type(workflow).model_fields
+        }
+        AlgorithmParameters.model_construct(**alg_params).to_yaml(
+            algorithm_parameters_file
+        )
         # unpacked to load the rest of the parameters for the DisplacementWorkflow
 
-        return cls(
-            input_file_group=InputFileGroup(
+        return cls.model_construct(
+            input_file_group=InputFileGroup.model_construct(
                 cslc_file_list=workflow.cslc_file_list,
                 frame_id=frame_id,
             ),
-            dynamic_ancillary_file_group=DynamicAncillaryFileGroup(
+            dynamic_ancillary_file_group=DynamicAncillaryFileGroup.model_construct(
                 algorithm_parameters_file=algorithm_parameters_file,
                 mask_file=workflow.mask_file,
                 ionosphere_files=workflow.correction_options.ionosphere_files,
                 troposphere_files=workflow.correction_options.troposphere_files,
                 dem_file=workflow.correction_options.dem_file,
-                static_layers_files=workflow.correction_options.geometry_files,
+                geometry_files=workflow.correction_options.geometry_files,
             ),
-            static_ancillary_file_group=StaticAncillaryFileGroup(
-                frame_to_burst_json=frame_to_burst_json,
-                reference_date_database_json=reference_date_json,
+            static_ancillary_file_group=StaticAncillaryFileGroup.model_construct(
+                frame_to_burst_json=_optional_path(frame_to_burst_json),
+                reference_date_database_json=_optional_path(reference_date_json),
             ),
-            primary_executable=PrimaryExecutable(
+            primary_executable=PrimaryExecutable.model_construct(
                 product_type=f"DISP_S1_{processing_mode.upper()}",
             ),
-            product_path_group=ProductPathGroup(
+            product_path_group=ProductPathGroup.model_construct(
                 product_path=output_directory,
                 scratch_path=workflow.work_directory,
-                sas_output_path=output_directory,
+                output_directory=output_directory,
                 save_compressed_slc=save_compressed_slc,
             ),
             worker_settings=workflow.worker_settings,
@@ -406,57 +447,103 @@ class RunConfig(YamlModel):
         )
 
 
+def _optional_path(p: Path | str | None) -> Path | None:
+    return Path(p) if p is not None else None
+
+
+@functools.lru_cache(maxsize=2048)
+def _cached_frame_bbox(
+    json_file: str | None, _mtime: float | None, frame_id: int
+) -> tuple[int, tuple[float, float, float, float]]:
+    """Get (and cache) the frame bounding box from `json_file`.
+
+    `_mtime` is only used as part of the cache key.
+    """
+    return get_frame_bbox(frame_id=frame_id, json_file=json_file)
+
+
+@functools.lru_cache(maxsize=2048)
+def _cached_burst_ids(
+    json_file: str | None, _mtime: float | None, frame_id: int
+) -> frozenset[str]:
+    """Get (and cache) the burst IDs of a frame from `json_file`.
+
+    `_mtime` is only used as part of the cache key.
+    """
+    return frozenset(get_burst_ids_for_frame(frame_id=frame_id, json_file=json_file))
+
+
+def load_algorithm_parameters(path: Path | str) -> AlgorithmParameters:
+    """Load the `AlgorithmParameters` YAML file at `path`.
+
+    The parsed file is cached, and re-read if it is modified on disk.
+    The returned instance is shared between callers, so it must not be modified.
+    """
+    path = os.fspath(path)
+    return _load_algorithm_parameters(path, Path(path).stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_algorithm_parameters(path: str, _mtime: float) -> AlgorithmParameters:
+    # `_mtime` is only part of the cache key, so modified files are re-read
+    return AlgorithmParameters.from_yaml(path)
+
+
 def _override_parameters(
     algorithm_parameters: AlgorithmParameters, frame_id: int
 ) -> AlgorithmParameters:
-    param_dict = algorithm_parameters.model_dump()
-    # Get the "override" file for this set of parameters
-    overrides_json = param_dict.pop("algorithm_parameters_overrides_json")
-
-    # Load any overrides for this frame
-    override_params = _parse_algorithm_overrides(overrides_json, frame_id)
-
-    # Override the dict with the new options
-    param_dict = _nested_update(param_dict, override_params)
-    return AlgorithmParameters(**param_dict)
-
-
-def _get_first_after_selected(
-    input_dates: Sequence[datetime.datetime],
-    selected_date: datetime.datetime,
-) -> int:
-    """Find the first index of `input_dates` which falls after `selected_date`."""
-    for idx, d in enumerate(input_dates):
-        if d >= selected_date:
-            return idx
-    else:
-        return -1
+    # Note: `algorithm_parameters` may be the shared, cached instance from
+    # `load_algorithm_parameters`, so always return a deep copy of it.
+    # Load any overrides for this frame from the "override" file
+    override_params = _parse_algorithm_overrides(
+        algorithm_parameters.algorithm_parameters_overrides_json, frame_id
+    )
+    updates: dict[str, Any] = {"algorithm_parameters_overrides_json": None}
+    if not override_params:
+        # Nothing to change: skip dumping and re-validating the full model
+        return algorithm_parameters.model_copy(update=updates, deep=True)
+
+    for key, value in override_params.items():
+        current = getattr(algorithm_parameters, key, None)
+        if not (isinstance(current, BaseModel) and isinstance(value, dict)):
+            # Top-level (or unknown) keys: validate the full, updated model
+            param_dict = algorithm_parameters.model_dump()
+            param_dict.pop("algorithm_parameters_overrides_json")
+            param_dict = _nested_update(param_dict, override_params)
+            return AlgorithmParameters(**param_dict)
+        # Only re-validate the sub-models which were touched by the overrides
+        updates[key] = type(current)(**_nested_update(current.model_dump(), value))
+    return algorithm_parameters.model_copy(update=updates, deep=True)
 
 
 def _compute_reference_dates(
     reference_datetimes, cslc_file_list
 ) -> tuple[int, datetime.datetime | None]:
     # Get the dates of the base phase (works for either compressed, or regular cslc)
-    # Use one burst ID as the template.
-    burst_to_file_list = group_by_burst(cslc_file_list)
-    burst_id = list(burst_to_file_list.keys())[0]
-    cur_files = sort_files_by_date(burst_to_file_list[burst_id])[0]
+    # Use the lowest burst ID as the template: only its files need to be sorted
+    # by date. (Bursts may have different dates, so the choice must not depend on
+    # the order of the input list.)
+    burst_id = min(get_burst_id(f) for f in cslc_file_list)
+    cur_files = [f for f in cslc_file_list if get_burst_id(f) == burst_id]
+    names, input_dates = _sort_names_by_date(cur_files)
     # Mark any files beginning with "compressed" as compressed
-    is_compressed = ["compressed" in str(Path(f).stem).lower() for f in cur_files]
-    input_dates = [get_dates(f)[0].date() for f in cur_files]
+    is_compressed = ["compressed" in name.lower() for name in names]
 
     output_reference_idx: int = 0
     extra_reference_date: datetime.datetime | None = None
     reference_dates = sorted({d.date() for d in reference_datetimes})
+    # Find the nearest index that is greater than or equal to each reference date
+    nearest_idxs = np.searchsorted(
+        np.array(input_dates, dtype="datetime64[D]"),
+        np.array(reference_dates, dtype="datetime64[D]"),
+        side="left",
+    )
 
-    for ref_date in reference_dates:
-        # Find the nearest index that is greater than or equal to the reference date
-        candidate_dates = [d for d in input_dates if d >= ref_date]
-        if not candidate_dates:
+    for ref_date, nearest_idx in zip(reference_dates, nearest_idxs.tolist()):
+        if nearest_idx >= len(input_dates):
+            # No input dates on or after this reference date
             continue
-        nearest_idx = _get_first_after_selected(input_dates, ref_date)
-
-        if nearest_idx == 0:
+        elif nearest_idx == 0:
             # We're only making a change if it's after the first date
             # (we're looking for mid-stack changes)
             continue
@@ -474,39 +561,108 @@ def _compute_reference_dates(
     return output_reference_idx, extra_reference_date
 
 
+def _sort_names_by_date(
+    file_list: Iterable[Path | str],
+) -> tuple[list[str], list[datetime.date]]:
+    """Sort the file names in `file_list` in the order of `sort_files_by_date`.
+
+    Returns the sorted names and their first dates. Only files which share a
+    first date are parsed fully with `get_dates` to break the tie.
+    """
+    names = [Path(f).name for f in file_list]
+    first_dates = [_get_first_date(name) for name in names]
+    date_counts = Counter(first_dates)
+
+    def _sort_key(i: int) -> tuple:
+        if date_counts[first_dates[i]] == 1:
+            return (first_dates[i],)
+        # Compare all the dates, e.g. so a compressed SLC sorts before the
+        # regular CSLC sharing its base phase date
+        return (first_dates[i], get_dates(names[i]))
+
+    order = sorted(range(len(names)), key=_sort_key)
+    return [names[i] for i in order], [first_dates[i] for i in order]
+
+
+def _get_first_date(filename: str) -> datetime.date:
+    """Get the first date in `filename`, with a fast path for OPERA file names."""
+    match = _OPERA_DATE_REGEX.search(filename)
+    if match is None:
+        return get_dates(filename)[0].date()
+    s = match.group(1)
+    return datetime.date(int(s[:4]), int(s[4:6]), int(s[6:8]))
+
+
 def _parse_reference_date_json(
     reference_date_json: Path | str | None, frame_id: int | str
 ):
     reference_datetimes: list[datetime.datetime] = []
     if reference_date_json is not None:
-        with open(reference_date_json) as f:
-            reference_date_strs = json.load(f)[str(frame_id)]
-            reference_datetimes = [
-                datetime.datetime.fromisoformat(s) for s in reference_date_strs
-            ]
+        reference_datetimes = list(
+            _load_reference_datetimes(
+                os.fspath(reference_date_json),
+                Path(reference_date_json).stat().st_mtime,
+                str(frame_id),
+            )
+        )
     else:
         reference_datetimes = []
     return reference_datetimes
 
 
+@functools.lru_cache(maxsize=256)
+def _load_reference_datetimes(
+    path: str, _mtime: float, frame_id: str
+) -> tuple[datetime.datetime, ...]:
+    """Parse (and cache) the reference datetimes for one frame.
+
+    `_mtime` is only used as part of the cache key.
+    """
+    reference_date_strs = _load_json_cached(path, _mtime)[frame_id]
+    return tuple(datetime.datetime.fromisoformat(s) for s in reference_date_strs)
+
+
 def _parse_algorithm_overrides(
     override_file: Path | str | None, frame_id: int | str
 ) -> dict[str, Any]:
     """Find the frame-specific parameters to override for algorithm_parameters."""
     if override_file is not None:
-        with open(override_file) as f:
-            overrides = json.load(f)
-            if "data" in overrides:
-                return overrides["data"].get(str(frame_id), {})
-            else:
-                return overrides.get(str(frame_id), {})
+        overrides = _load_json_cached(
+            os.fspath(override_file), Path(override_file).stat().st_mtime
+        )
+        if "data" in overrides:
+            return overrides["data"].get(str(frame_id), {})
+        else:
+            return overrides.get(str(frame_id), {})
     return {}
 
 
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(path: str, _mtime: float) -> Any:
+    """Load (and cache) a JSON file.
+
+    `_mtime` is only used as part of the cache key. The returned object is shared
+    between callers, so it must not be modified.
+    """
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
 def _nested_update(base: dict, updates: dict):
-    for k, v in updates.items():
-        if isinstance(v, dict):
-            base[k] = _nested_update(base.get(k, {}), v)
-        else:
-            base[k] = v
+    if not updates:
+        return base
+    stack = [(base, updates)]
+    while stack:
+        cur_base, cur_updates = stack.pop()
+        # Set all the leaf values at this level at once, then descend into dicts
+        cur_base.update(
+            (k, v) for k, v in cur_updates.items() if not isinstance(v, dict)
+        )
+        for k, v in cur_updates.items():
+            if not isinstance(v, dict):
+                continue
+            child = cur_base.get(k)
+            if not isinstance(child, dict):
+                child = cur_base[k] = {}
+            stack.append((child, v))
     return base
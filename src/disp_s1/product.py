@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import logging
+import os
+import zlib
+from collections import defaultdict
 from collections.abc import Iterable, Mapping
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import StringIO
-from multiprocessing import get_context
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.context import BaseContext
 from pathlib import Path
 from typing import Any, Literal, NamedTuple, Optional, Sequence, Union
 
@@ -24,11 +29,8 @@ from dolphin.workflows import DisplacementWorkflow, YamlModel
 from numpy.typing import ArrayLike, DTypeLike
 from opera_utils import (
     OPERA_DATASET_NAME,
-    filter_by_burst_id,
-    filter_by_date,
+    get_burst_id,
     get_dates,
-    get_radar_wavelength,
-    get_zero_doppler_time,
     parse_filename,
 )
 
@@ -37,7 +39,7 @@ from ._baselines import _interpolate_data, compute_baselines
 from ._common import DATETIME_FORMAT
 from ._reference import ReferencePoint
 from .browse_image import make_browse_image_from_arr
-from .pge_runconfig import AlgorithmParameters, RunConfig
+from .pge_runconfig import RunConfig, load_algorithm_parameters
 from .product_info import DISPLACEMENT_PRODUCTS, ProductInfo
 from .solid_earth_tides import calculate_solid_earth_tides_correction
 
@@ -58,12 +60,32 @@ GLOBAL_ATTRS = {
 # Use the "paging file space strategy"
 # https://docs.h5py.org/en/stable/high/file.html#h5py.File
 # Page size should be larger than the largest chunk in the file
-FILE_OPTS = {"fs_strategy": "page", "fs_page_size": 2**22}
+FS_PAGE_SIZE = 2**22
+FILE_OPTS = {"fs_strategy": "page", "fs_page_size": FS_PAGE_SIZE}
+# Page buffer used when reopening a paged output file, so that the metadata pages
+# are read from disk once rather than on every lookup.
+# Must be a multiple of the page size.
+PAGE_BUF_SIZE = 16 * FS_PAGE_SIZE
 CHUNK_SHAPE = (128, 128)
 
 # Convert chunks to a tuple or h5py errors
 HDF5_OPTS = io.DEFAULT_HDF5_OPTIONS.copy()
 HDF5_OPTS["chunks"] = tuple(CHUNK_SHAPE)  # type: ignore
+# Environment variable to choose the compressed SLC compression filter:
+# "gzip" (default, readable by any HDF5/NetCDF library) or "zstd" (faster,
+# but requires the `hdf5plugin` package to write and to read the output)
+COMPRESSION_ENV_VAR = "DISP_S1_COMPRESSION"
+# Minimum size of the raw data chunk cache (the HDF5 default is only 1 MiB)
+MIN_CHUNK_CACHE_BYTES = 2**26
+# Environment variable to opt in to compressing the chunks of streamed rasters
+# in Python threads and writing them with `write_direct_chunk`, bypassing HDF5's
+# filter pipeline. Off by default: "1"/"true" enables it.
+DIRECT_CHUNK_ENV_VAR = "DISP_S1_DIRECT_CHUNK_WRITES"
+# Number of threads used to compress chunks when writing streamed rasters
+COMPRESSION_THREADS = 4
+# Metadata cache size when writing products (the HDF5 default starts at 2 MiB),
+# so object headers/B-tree nodes of the many small datasets aren't evicted
+METADATA_CACHE_BYTES = 2**27
 # The GRID_MAPPING_DSET variable is used to store the name of the dataset containing
 # the grid mapping information, which includes the coordinate reference system (CRS)
 # and the GeoTransform. This is in accordance with the CF 1.8 conventions for adding
@@ -96,6 +118,7 @@ def create_output_product(
     near_far_incidence_angles: tuple[float, float] = (30.0, 45.0),
     reference_point: ReferencePoint | None = None,
     corrections: Optional[dict[str, ArrayLike]] = None,
+    store_metadata_as_attrs: bool = False,
 ):
     """Create the OPERA output product in NetCDF format.
 
@@ -142,11 +165,18 @@ def create_output_product(
         If None, will record empty in the dataset's attributes
     corrections : dict[str, ArrayLike], optional
         A dictionary of corrections to write to the output file, by default None
+    store_metadata_as_attrs : bool
+        Store the scalar identification/metadata values as group attributes
+        instead of scalar datasets. Each value's description, long name and
+        units are stored as `{name}_description`, `{name}_long_name`, etc.
+        Faster to write, but doesn't follow the product specification layout.
+        Default is False.
 
     """
     if corrections is None:
         corrections = {}
-    algorithm_parameters = AlgorithmParameters.from_yaml(
+    # (Cached, since each product in a run reads the same file)
+    algorithm_parameters = load_algorithm_parameters(
         pge_runconfig.dynamic_ancillary_file_group.algorithm_parameters_file
     )
 
@@ -160,28 +190,36 @@ def create_output_product(
     if len(secondary_cslc_files) == 0:
         raise ValueError("Missing input secondary cslc files")
 
+    def _filename_key(f):
+        return Path(f).name
+
     def _get_start_end_cslcs(files):
         if len(files) == 1:
             start = end = files[0]
         else:
-            # Sorting by name means the earlier Burst IDs come first.
+            # Ordering by name means the earlier Burst IDs come first.
             # Since the Burst Ids are numbered in increasing order of acquisition time,
             # This is also valid to get the start/end bursts within the frame.
-            start, *_, end = sorted(files, key=lambda f: Path(f).name)
+            start = min(files, key=_filename_key)
+            end = max(files, key=_filename_key)
         logger.debug(f"Start, end files: {start}, {end}")
         return start, end
 
     reference_start_file, reference_end_file = _get_start_end_cslcs(
         reference_cslc_files
     )
-    reference_start_time = get_zero_doppler_time(reference_start_file, type_="start")
-    reference_end_time = get_zero_doppler_time(reference_end_file, type_="end")
-
     secondary_start, secondary_end = _get_start_end_cslcs(secondary_cslc_files)
-    secondary_start_time = get_zero_doppler_time(secondary_start, type_="start")
-    secondary_end_time = get_zero_doppler_time(secondary_end, type_="end")
-
-    radar_wavelength = get_radar_wavelength(reference_cslc_files[0])
+    # Read all needed CSLC metadata up front, opening each file once
+    reference_start_meta = _extract_cslc_metadata(reference_start_file)
+    reference_end_meta = _extract_cslc_metadata(reference_end_file)
+    secondary_start_meta = _extract_cslc_metadata(secondary_start)
+    secondary_end_meta = _extract_cslc_metadata(secondary_end)
+    reference_start_time = reference_start_meta.zero_doppler_start_time
+    reference_end_time = reference_end_meta.zero_doppler_end_time
+    secondary_start_time = secondary_start_meta.zero_doppler_start_time
+    secondary_end_time = secondary_end_meta.zero_doppler_end_time
+
+    radar_wavelength = reference_start_meta.radar_wavelength
     phase2disp = -1 * float(radar_wavelength) / (4.0 * np.pi)
 
     y, x = _create_yx_arrays(gt=gt, shape=shape)
@@ -218,17 +256,22 @@ def create_output_product(
 
     # Load and process unwrapped phase data, needs more custom masking
     unw_arr_ma = io.load_gdal(unw_filename, masked=True)
-    unw_arr = np.ma.filled(unw_arr_ma, 0)
+    # Zero out the nodata in the loaded buffer itself, rather than making a filled
+    # copy. The masked array is not used again, so `unw_arr` can be scaled in place
+    unw_arr = np.ma.getdata(unw_arr_ma).astype(np.float32, copy=False)
+    unw_nodata = np.ma.getmask(unw_arr_ma)
+    if unw_nodata is not np.ma.nomask:
+        np.copyto(unw_arr, 0, where=unw_nodata)
+    del unw_arr_ma, unw_nodata
+    # Note: this also includes valid pixels which are exactly 0 (e.g. the reference)
     mask = unw_arr == 0
 
     input_units = io.get_raster_units(unw_filename)
-    if not input_units or input_units not in ("meters", "radians"):
+    if input_units not in ("meters", "radians"):
         logger.warning(f"Unknown units for {unw_filename}: assuming radians")
-        disp_arr = unw_arr * phase2disp
-    elif input_units == "radians":
-        disp_arr = unw_arr * phase2disp
-    else:
-        disp_arr = unw_arr
+    if input_units != "meters":
+        unw_arr *= phase2disp
+    disp_arr = unw_arr
 
     _, x_res, _, _, _, y_res = gt
     # Average for the pixel spacing for filtering
@@ -241,38 +284,59 @@ def create_output_product(
 
     # Create the commended mask:
     temporal_coherence = io.load_gdal(temp_coh_filename, masked=True)
+    tmp = np.empty(temporal_coherence.shape, dtype=bool)
+    is_valid_temporal_coherence = np.logical_not(
+        np.ma.getmaskarray(temporal_coherence), out=tmp
+    )
     # Get summary statistics on the layers for CMR filtering/searching purposes
-    average_temporal_coherence = temporal_coherence.mean()
+    average_temporal_coherence = _average_valid_pixels(
+        temporal_coherence, is_valid_temporal_coherence
+    )
 
+    # Mark pixels that are bad. The mask is built in-place, using one scratch
+    # buffer, rather than allocating a new array for each condition.
+    # Each layer is compared on its raw values and dropped before the next loads.
+    # As with the masked array comparisons, nodata temporal coherence pixels use
+    # their raw fill value, and nodata pixels in the similarity, conncomp and
+    # water layers count as bad.
+    # Low quality pixels have both bad temporal coherence and bad similarity
+    del is_valid_temporal_coherence
+    bad_pixel_mask = np.less(np.ma.getdata(temporal_coherence), 0.6)
+    del temporal_coherence
+
+    similarity = io.load_gdal(similarity_filename, masked=True)
+    bad_pixel_mask &= _masked_predicate(np.less, similarity, 0.5, out=tmp)
+    del similarity
+    # If a pixel has any of the reasons to be bad, recommend masking
+    conncomps = io.load_gdal(conncomp_filename, masked=True)
+    bad_pixel_mask |= _masked_predicate(np.equal, conncomps, 0, out=tmp)
+    del conncomps
     if water_mask_filename:
-        water_mask_data = io.load_gdal(water_mask_filename, masked=True).filled(0)
-        is_water = water_mask_data == 0
-    else:
-        # Not provided: Don't indicate anything is water in this mask.
-        is_water = np.zeros(temporal_coherence.shape, dtype=bool)
-
-    conncomps = io.load_gdal(conncomp_filename, masked=True).filled(0)
-    similarity = io.load_gdal(similarity_filename, masked=True).filled(0)
+        water_mask = io.load_gdal(water_mask_filename, masked=True)
+        bad_pixel_mask |= _masked_predicate(np.equal, water_mask, 0, out=tmp)
+        del water_mask
+    # (If no water mask is provided, don't indicate anything is water.)
 
-    # Mark pixels that are bad
-    is_zero_conncomp = conncomps == 0
-    bad_temporal_coherence = temporal_coherence < 0.6
-    bad_similarity = similarity < 0.5
-    is_low_quality = bad_temporal_coherence & bad_similarity
-
-    # If a pixel has any of the reasons to be bad, recommend masking
-    bad_pixel_mask = is_water | is_zero_conncomp | is_low_quality
     # Note: An alternate way to view this:
     # good_conncomp & is_no_water & (good_temporal_coherence | good_similarity)
-    recommended_mask = np.logical_not(bad_pixel_mask)
-    del temporal_coherence, conncomps, similarity
+    recommended_mask = np.logical_not(bad_pixel_mask, out=tmp)
 
+    # Quantize the displacement to its output precision (the `keep_bits` set in
+    # `product_info`) now, rather than at write time, so the filter sees the same
+    # values which get saved
+    round_mantissa(disp_arr, keep_bits=DISPLACEMENT_PRODUCTS.displacement.keep_bits)
     filtered_disp_arr = filtering.filter_long_wavelength(
         unwrapped_phase=disp_arr,
         bad_pixel_mask=bad_pixel_mask,
         wavelength_cutoff=wavelength_cutoff,
         pixel_spacing=pixel_spacing,
-    ).astype(np.float32)
+        # Let the filter's FFTs use the configured threads for each worker
+        workers=dolphin_config.worker_settings.threads_per_worker,
+    ).astype(np.float32, copy=False)
+    round_mantissa(
+        filtered_disp_arr,
+        keep_bits=DISPLACEMENT_PRODUCTS.short_wavelength_displacement.keep_bits,
+    )
     DISPLACEMENT_PRODUCTS.short_wavelength_displacement.attrs |= {
         "wavelength_cutoff": str(wavelength_cutoff)
     }
@@ -283,7 +347,8 @@ def create_output_product(
 
     product_infos: list[ProductInfo] = list(DISPLACEMENT_PRODUCTS)
 
-    with h5netcdf.File(output_name, "w", **FILE_OPTS) as f:
+    with h5netcdf.File(output_name, "w", **FILE_OPTS, **_chunk_cache_opts(cols)) as f:
+        _enlarge_metadata_cache(_get_h5py_object(f).id)
         f.attrs.update(GLOBAL_ATTRS)
         _create_grid_mapping(group=f, crs=crs, gt=gt)
 
@@ -301,7 +366,7 @@ def create_output_product(
             variable_name="reference_time",
         )
         for info, data in zip(product_infos[:2], [disp_arr, filtered_disp_arr]):
-            round_mantissa(data, keep_bits=info.keep_bits)
+            # (Both arrays were already rounded to `info.keep_bits` above)
             _create_geo_dataset(
                 group=f,
                 name=info.name,
@@ -329,7 +394,8 @@ def create_output_product(
         _create_geo_dataset(
             group=f,
             name=info.name,
-            data=recommended_mask.astype("uint8"),
+            # bool and uint8 share a layout, so view rather than copy the mask
+            data=recommended_mask.view(np.uint8),
             description=info.description,
             long_name=info.long_name,
             fillvalue=info.fillvalue,
@@ -349,10 +415,23 @@ def create_output_product(
 
         for info, filename in zip(product_infos[3:], data_files, strict=True):
             if filename is not None and Path(filename).exists():
-                data = io.load_gdal(filename).astype(info.dtype)
-            else:
-                data = np.full(shape=shape, fill_value=info.fillvalue, dtype=info.dtype)
-
+                # Create the empty dataset, then stream the raster into it
+                dset = _create_geo_dataset(
+                    group=f,
+                    name=info.name,
+                    data=None,
+                    dtype=info.dtype,
+                    description=info.description,
+                    long_name=info.long_name,
+                    fillvalue=info.fillvalue,
+                    attrs=info.attrs,
+                )
+                _write_raster_by_strips(
+                    dset, filename, dtype=info.dtype, keep_bits=info.keep_bits
+                )
+                continue
+
+            data = np.full(shape=shape, fill_value=info.fillvalue, dtype=info.dtype)
             if info.keep_bits is not None:
                 round_mantissa(data, keep_bits=info.keep_bits)
 
@@ -366,56 +445,59 @@ def create_output_product(
                 attrs=info.attrs,
             )
 
-    if los_east_file is not None and los_north_file is not None:
-        logger.info("Calculating solid earth tide")
-        ref_tuple = (
-            (reference_point.row, reference_point.col) if reference_point else None
+        if los_east_file is not None and los_north_file is not None:
+            logger.info("Calculating solid earth tide")
+            ref_tuple = (
+                (reference_point.row, reference_point.col) if reference_point else None
+            )
+            orbit_direction = reference_start_meta.orbit_direction
+            solid_earth_los = calculate_solid_earth_tides_correction(
+                like_filename=unw_filename,
+                reference_start_time=reference_start_time,
+                reference_stop_time=reference_end_time,
+                secondary_start_time=secondary_start_time,
+                secondary_stop_time=secondary_end_time,
+                los_east_file=los_east_file,
+                los_north_file=los_north_file,
+                orbit_direction=orbit_direction,
+                reference_point=ref_tuple,
+            )
+            corrections["solid_earth"] = solid_earth_los
+
+        _create_corrections_group(
+            f=f,
+            corrections=corrections,
+            shape=shape,
+            gt=gt,
+            crs=crs,
+            secondary_start_time=secondary_start_time,
+            reference_point=reference_point,
         )
-        orbit_direction = _get_orbit_direction(reference_cslc_files[0])
-        solid_earth_los = calculate_solid_earth_tides_correction(
-            like_filename=unw_filename,
+
+        orbit_type = reference_start_meta.orbit_type
+        _create_identification_group(
+            f=f,
+            pge_runconfig=pge_runconfig,
+            radar_wavelength=radar_wavelength,
+            orbit_type=orbit_type,
             reference_start_time=reference_start_time,
-            reference_stop_time=reference_end_time,
+            reference_end_time=reference_end_time,
             secondary_start_time=secondary_start_time,
-            secondary_stop_time=secondary_end_time,
-            los_east_file=los_east_file,
-            los_north_file=los_north_file,
-            orbit_direction=orbit_direction,
-            reference_point=ref_tuple,
+            secondary_end_time=secondary_end_time,
+            footprint_wkt=footprint_wkt,
+            product_bounds=tuple(bounds),
+            average_temporal_coherence=average_temporal_coherence,
+            near_far_incidence_angles=near_far_incidence_angles,
+            store_as_attrs=store_metadata_as_attrs,
         )
-        corrections["solid_earth"] = solid_earth_los
-
-    _create_corrections_group(
-        output_name=output_name,
-        corrections=corrections,
-        shape=shape,
-        gt=gt,
-        crs=crs,
-        secondary_start_time=secondary_start_time,
-        reference_point=reference_point,
-    )
-
-    orbit_type = _get_orbit_type(reference_cslc_files[0])
-    _create_identification_group(
-        output_name=output_name,
-        pge_runconfig=pge_runconfig,
-        radar_wavelength=radar_wavelength,
-        orbit_type=orbit_type,
-        reference_start_time=reference_start_time,
-        reference_end_time=reference_end_time,
-        secondary_start_time=secondary_start_time,
-        secondary_end_time=secondary_end_time,
-        footprint_wkt=footprint_wkt,
-        product_bounds=tuple(bounds),
-        average_temporal_coherence=average_temporal_coherence,
-        near_far_incidence_angles=near_far_incidence_angles,
-    )
-
-    _create_metadata_group(
-        output_name=output_name,
-        pge_runconfig=pge_runconfig,
-        dolphin_config=dolphin_config,
-    )
+
+        _create_metadata_group(
+            f=f,
+            pge_runconfig=pge_runconfig,
+            dolphin_config=dolphin_config,
+            store_as_attrs=store_metadata_as_attrs,
+        )
+
     copy_cslc_metadata_to_displacement(
         reference_cslc_file=reference_start_file,
         secondary_cslc_file=secondary_start,
@@ -424,7 +506,7 @@ def create_output_product(
 
 
 def _create_corrections_group(
-    output_name: Filename,
+    f: h5netcdf.File,
     corrections: dict[str, ArrayLike],
     shape: tuple[int, int],
     gt: list[float],
@@ -438,93 +520,92 @@ def _create_corrections_group(
         # Use same amount of truncation for all correction layers
         if np.issubdtype(data.dtype, np.floating):
             round_mantissa(data, keep_bits=keep_bits)
-    logger.info("Creating corrections group in %s", output_name)
-    with h5netcdf.File(output_name, "a") as f:
-        # Create the group holding phase corrections used on the unwrapped phase
-        corrections_group = f.create_group(CORRECTIONS_GROUP_NAME)
-        corrections_group.attrs["description"] = (
-            "Phase corrections applied to the unwrapped_phase"
-        )
-        empty_arr = np.zeros(shape, dtype="float32")
-
-        # TODO: Are we going to downsample these for space?
-        # if so, they need they're own X/Y variables and GeoTransform
-        _create_grid_mapping(group=corrections_group, crs=crs, gt=gt)
-        _create_yx_dsets(group=corrections_group, gt=gt, shape=shape, include_time=True)
-        _create_time_dset(
-            group=corrections_group,
-            time=secondary_start_time,
-            long_name="Time corresponding to beginning of secondary image",
-        )
-        ionosphere = corrections.get("ionosphere", empty_arr)
-        _create_geo_dataset(
-            group=corrections_group,
-            name="ionospheric_delay",
-            long_name="Ionospheric Delay",
-            data=ionosphere,
-            description="Ionospheric phase delay used to correct the unwrapped phase",
-            fillvalue=np.nan,
-            attrs={"units": "meters"},
-        )
-        solid_earth = corrections.get("solid_earth", empty_arr)
-        _create_geo_dataset(
-            group=corrections_group,
-            name="solid_earth_tide",
-            long_name="Solid Earth Tide",
-            data=solid_earth,
-            description="Solid Earth tide used to correct the unwrapped phase",
-            fillvalue=np.nan,
-            attrs={"units": "meters"},
-        )
-        baseline = corrections.get("baseline", empty_arr)
-        _create_geo_dataset(
-            group=corrections_group,
-            name="perpendicular_baseline",
-            long_name="Perpendicular Baseline",
-            data=baseline,
-            description=(
-                "Perpendicular baseline between reference and secondary acquisitions"
-            ),
-            fillvalue=np.nan,
-            attrs={"units": "meters"},
-        )
-        # Make a scalar dataset for the reference point
-        if reference_point is not None:
-            row, col, lat, lon = reference_point
-            ref_attrs = {
-                "rows": [row],
-                "cols": [col],
-                "latitudes": [lat],
-                "longitudes": [lon],
-                "units": "unitless",
-            }
-        else:
-            ref_attrs = {
-                "rows": [],
-                "cols": [],
-                "latitudes": [],
-                "longitudes": [],
-                "units": "unitless",
-            }
-        _create_dataset(
-            group=corrections_group,
-            name="reference_point",
-            dimensions=(),
-            data=0,
-            fillvalue=0,
-            description=(
-                "Dummy dataset containing attributes with the locations where the"
-                " reference phase was taken."
-            ),
-            dtype=int,
-            # Note: the dataset contains attributes with lists, since the reference
-            # could have come from multiple points (e.g. boxcar average of an area).
-            attrs=ref_attrs,
-        )
+    logger.info("Creating corrections group in %s", f.filename)
+    # Create the group holding phase corrections used on the unwrapped phase
+    corrections_group = f.create_group(CORRECTIONS_GROUP_NAME)
+    corrections_group.attrs["description"] = (
+        "Phase corrections applied to the unwrapped_phase"
+    )
+    empty_arr = np.zeros(shape, dtype="float32")
+
+    # TODO: Are we going to downsample these for space?
+    # if so, they need they're own X/Y variables and GeoTransform
+    _create_grid_mapping(group=corrections_group, crs=crs, gt=gt)
+    _create_yx_dsets(group=corrections_group, gt=gt, shape=shape, include_time=True)
+    _create_time_dset(
+        group=corrections_group,
+        time=secondary_start_time,
+        long_name="Time corresponding to beginning of secondary image",
+    )
+    ionosphere = corrections.get("ionosphere", empty_arr)
+    _create_geo_dataset(
+        group=corrections_group,
+        name="ionospheric_delay",
+        long_name="Ionospheric Delay",
+        data=ionosphere,
+        description="Ionospheric phase delay used to correct the unwrapped phase",
+        fillvalue=np.nan,
+        attrs={"units": "meters"},
+    )
+    solid_earth = corrections.get("solid_earth", empty_arr)
+    _create_geo_dataset(
+        group=corrections_group,
+        name="solid_earth_tide",
+        long_name="Solid Earth Tide",
+        data=solid_earth,
+        description="Solid Earth tide used to correct the unwrapped phase",
+        fillvalue=np.nan,
+        attrs={"units": "meters"},
+    )
+    baseline = corrections.get("baseline", empty_arr)
+    _create_geo_dataset(
+        group=corrections_group,
+        name="perpendicular_baseline",
+        long_name="Perpendicular Baseline",
+        data=baseline,
+        description=(
+            "Perpendicular baseline between reference and secondary acquisitions"
+        ),
+        fillvalue=np.nan,
+        attrs={"units": "meters"},
+    )
+    # Make a scalar dataset for the reference point
+    if reference_point is not None:
+        row, col, lat, lon = reference_point
+        ref_attrs = {
+            "rows": [row],
+            "cols": [col],
+            "latitudes": [lat],
+            "longitudes": [lon],
+            "units": "unitless",
+        }
+    else:
+        ref_attrs = {
+            "rows": [],
+            "cols": [],
+            "latitudes": [],
+            "longitudes": [],
+            "units": "unitless",
+        }
+    _create_dataset(
+        group=corrections_group,
+        name="reference_point",
+        dimensions=(),
+        data=0,
+        fillvalue=0,
+        description=(
+            "Dummy dataset containing attributes with the locations where the"
+            " reference phase was taken."
+        ),
+        dtype=int,
+        # Note: the dataset contains attributes with lists, since the reference
+        # could have come from multiple points (e.g. boxcar average of an area).
+        attrs=ref_attrs,
+    )
 
 
 def _create_identification_group(
-    output_name: Filename,
+    f: h5netcdf.File,
     pge_runconfig: RunConfig,
     radar_wavelength: float,
     orbit_type: str,
@@ -536,596 +617,660 @@ def _create_identification_group(
     product_bounds: tuple[float, float, float, float],
     average_temporal_coherence: float,
     near_far_incidence_angles: tuple[float, float] = (30.0, 45.0),
+    store_as_attrs: bool = False,
 ) -> None:
     """Create the identification group in the output file."""
-    with h5netcdf.File(output_name, "a") as f:
-        identification_group = f.create_group(IDENTIFICATION_GROUP_NAME)
-        _create_dataset(
-            group=identification_group,
-            name="processing_facility",
-            dimensions=(),
-            data="NASA Jet Propulsion Laboratory on AWS",
-            fillvalue=None,
-            description="Product processing facility",
-        )
-        _create_dataset(
-            group=identification_group,
-            name="frame_id",
-            dimensions=(),
-            data=pge_runconfig.input_file_group.frame_id,
-            fillvalue=None,
-            description="ID number of the processed frame",
-        )
-        _create_dataset(
-            group=identification_group,
-            name="product_version",
-            dimensions=(),
-            data=pge_runconfig.product_path_group.product_version,
-            fillvalue=None,
-            description="Version of the product",
-        )
-        _create_dataset(
-            group=identification_group,
-            name="static_layers_data_access",
-            dimensions=(),
-            data=pge_runconfig.product_path_group.static_layers_data_access,
-            fillvalue=None,
-            description=(
-                "Location of the static layers product associated with this product"
-                " (URL or DOI)"
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="radar_band",
-            dimensions=(),
-            data="C",
-            fillvalue=None,
-            description="Acquired radar frequency band",
-        )
-
-        _create_dataset(
-            group=identification_group,
-            name="reference_zero_doppler_start_time",
-            dimensions=(),
-            data=reference_start_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "Zero doppler start time of the first burst contained in the frame for"
-                " the reference acquisition."
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="reference_zero_doppler_end_time",
-            dimensions=(),
-            data=reference_end_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "Zero doppler start time of the last burst contained in the frame for"
-                " the reference acquisition."
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="secondary_zero_doppler_start_time",
-            dimensions=(),
-            data=secondary_start_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "Zero doppler start time of the first burst contained in the frame for"
-                " the secondary acquisition."
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="secondary_zero_doppler_end_time",
-            dimensions=(),
-            data=secondary_end_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "Zero doppler start time of the last burst contained in the frame for"
-                " the secondary acquisition."
-            ),
-        )
+    # Note: by default these are scalar datasets rather than group attributes.
+    # They are part of the product specification, and `validate.py` requires the
+    # group keys of a new product to match those of the golden product.
+    create_dataset = _set_scalar_attr if store_as_attrs else _create_dataset
+    identification_group = f.create_group(IDENTIFICATION_GROUP_NAME)
+    create_dataset(
+        group=identification_group,
+        name="processing_facility",
+        dimensions=(),
+        data="NASA Jet Propulsion Laboratory on AWS",
+        fillvalue=None,
+        description="Product processing facility",
+    )
+    create_dataset(
+        group=identification_group,
+        name="frame_id",
+        dimensions=(),
+        data=pge_runconfig.input_file_group.frame_id,
+        fillvalue=None,
+        description="ID number of the processed frame",
+    )
+    create_dataset(
+        group=identification_group,
+        name="product_version",
+        dimensions=(),
+        data=pge_runconfig.product_path_group.product_version,
+        fillvalue=None,
+        description="Version of the product",
+    )
+    create_dataset(
+        group=identification_group,
+        name="static_layers_data_access",
+        dimensions=(),
+        data=pge_runconfig.product_path_group.static_layers_data_access,
+        fillvalue=None,
+        description=(
+            "Location of the static layers product associated with this product"
+            " (URL or DOI)"
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="radar_band",
+        dimensions=(),
+        data="C",
+        fillvalue=None,
+        description="Acquired radar frequency band",
+    )
 
-        _create_dataset(
-            group=identification_group,
-            name="bounding_polygon",
-            dimensions=(),
-            data=footprint_wkt,
-            fillvalue=None,
-            description="WKT representation of bounding polygon of the image",
-            attrs={"units": "degrees"},
-        )
+    create_dataset(
+        group=identification_group,
+        name="reference_zero_doppler_start_time",
+        dimensions=(),
+        data=reference_start_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "Zero doppler start time of the first burst contained in the frame for"
+            " the reference acquisition."
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="reference_zero_doppler_end_time",
+        dimensions=(),
+        data=reference_end_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "Zero doppler start time of the last burst contained in the frame for"
+            " the reference acquisition."
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="secondary_zero_doppler_start_time",
+        dimensions=(),
+        data=secondary_start_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "Zero doppler start time of the first burst contained in the frame for"
+            " the secondary acquisition."
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="secondary_zero_doppler_end_time",
+        dimensions=(),
+        data=secondary_end_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "Zero doppler start time of the last burst contained in the frame for"
+            " the secondary acquisition."
+        ),
+    )
 
-        _create_dataset(
-            group=identification_group,
-            name="radar_wavelength",
-            dimensions=(),
-            data=radar_wavelength,
-            fillvalue=None,
-            description="Wavelength of the transmitted signal",
-            attrs={"units": "meters"},
-        )
+    create_dataset(
+        group=identification_group,
+        name="bounding_polygon",
+        dimensions=(),
+        data=footprint_wkt,
+        fillvalue=None,
+        description="WKT representation of bounding polygon of the image",
+        attrs={"units": "degrees"},
+    )
 
-        _create_dataset(
-            group=identification_group,
-            name="reference_datetime",
-            dimensions=(),
-            data=reference_start_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "UTC datetime of the acquisition sensing start of the reference epoch"
-                " to which the unwrapped phase is referenced."
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="secondary_datetime",
-            dimensions=(),
-            data=secondary_start_time.strftime(DATETIME_FORMAT),
-            fillvalue=None,
-            description=(
-                "UTC datetime of the acquisition sensing start of current acquisition"
-                " used to create the unwrapped phase."
-            ),
-        )
-        _create_dataset(
-            group=identification_group,
-            name="average_temporal_coherence",
-            dimensions=(),
-            data=average_temporal_coherence,
-            fillvalue=None,
-            description="Mean value of valid pixels within temporal_coherence layer.",
-            attrs={"units": "unitless"},
-        )
-        # CEOS: Section 1.3
-        _create_dataset(
-            group=identification_group,
-            name="ceos_analysis_ready_data_product_type",
-            dimensions=(),
-            data="InSAR",
-            fillvalue=None,
-            description="CEOS Analysis Ready Data (CARD) product type name",
-            attrs={"units": "unitless"},
-        )
-        # CEOS: Section 1.4
-        _create_dataset(
-            group=identification_group,
-            name="ceos_analysis_ready_data_document_identifier",
-            dimensions=(),
-            data="https://github.com/ceos-org/",
-            fillvalue=None,
-            description="CEOS Analysis Ready Data (CARD) document identifier",
-            attrs={"units": "unitless"},
-        )
-        input_dts = sorted(
-            [get_dates(f)[0] for f in pge_runconfig.input_file_group.cslc_file_list]
-        )
-        processing_dts = sorted(
-            get_dates(f)[1]
-            for f in pge_runconfig.input_file_group.cslc_file_list
-            if "compressed" not in str(f).lower()
-        )
-        parsed_files = [
-            parse_filename(f)
-            for f in pge_runconfig.input_file_group.cslc_file_list
-            if "compressed" not in str(f).lower()
-        ]
-        input_sensors = {p.get("sensor") for p in parsed_files if p.get("sensor")}
+    create_dataset(
+        group=identification_group,
+        name="radar_wavelength",
+        dimensions=(),
+        data=radar_wavelength,
+        fillvalue=None,
+        description="Wavelength of the transmitted signal",
+        attrs={"units": "meters"},
+    )
 
-        # CEOS: Section 1.5
-        _create_dataset(
-            group=identification_group,
-            name="source_data_satellite_names",
-            dimensions=(),
-            data=",".join(input_sensors),
-            fillvalue=None,
-            description="Names of satellites included in input granules",
-            attrs={"units": "unitless"},
-        )
-        starting_date_str = input_dts[0].isoformat()
-        _create_dataset(
-            group=identification_group,
-            name="source_data_earliest_acquisition",
-            dimensions=(),
-            data=starting_date_str,
-            fillvalue=None,
-            description="Datetime of earliest input granule used during processing",
-            attrs={"units": "unitless"},
-        )
-        last_date_str = input_dts[-1].isoformat()
-        _create_dataset(
-            group=identification_group,
-            name="source_data_latest_acquisition",
-            dimensions=(),
-            data=last_date_str,
-            fillvalue=None,
-            description="Datetime of latest input granule used during processing",
-            attrs={"units": "unitless"},
-        )
-        early_processing_date_str = processing_dts[0].isoformat()
-        _create_dataset(
-            group=identification_group,
-            name="source_data_earliest_processing_datetime",
-            dimensions=(),
-            data=early_processing_date_str,
-            fillvalue=None,
-            description="Earliest processing datetime of input granules",
-            attrs={"units": "unitless"},
-        )
-        last_processing_date_str = processing_dts[-1].isoformat()
-        _create_dataset(
-            group=identification_group,
-            name="source_data_latest_processing_datetime",
-            dimensions=(),
-            data=last_processing_date_str,
-            fillvalue=None,
-            description="Latest processing datetime of input granules",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="ceos_number_of_input_granules",
-            dimensions=(),
-            data=len(pge_runconfig.input_file_group.cslc_file_list),
-            fillvalue=None,
-            description="Number of input data granule used during processing.",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_orbit_type",
-            dimensions=(),
-            data=orbit_type,
-            fillvalue=None,
-            description=(
-                "Type of orbit (precise, restituted) used during input data processing"
-            ),
-            attrs={"units": "unitless"},
-        )
+    create_dataset(
+        group=identification_group,
+        name="reference_datetime",
+        dimensions=(),
+        data=reference_start_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "UTC datetime of the acquisition sensing start of the reference epoch"
+            " to which the unwrapped phase is referenced."
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="secondary_datetime",
+        dimensions=(),
+        data=secondary_start_time.strftime(DATETIME_FORMAT),
+        fillvalue=None,
+        description=(
+            "UTC datetime of the acquisition sensing start of current acquisition"
+            " used to create the unwrapped phase."
+        ),
+    )
+    create_dataset(
+        group=identification_group,
+        name="average_temporal_coherence",
+        dimensions=(),
+        data=average_temporal_coherence,
+        fillvalue=None,
+        description="Mean value of valid pixels within temporal_coherence layer.",
+        attrs={"units": "unitless"},
+    )
+    # CEOS: Section 1.3
+    create_dataset(
+        group=identification_group,
+        name="ceos_analysis_ready_data_product_type",
+        dimensions=(),
+        data="InSAR",
+        fillvalue=None,
+        description="CEOS Analysis Ready Data (CARD) product type name",
+        attrs={"units": "unitless"},
+    )
+    # CEOS: Section 1.4
+    create_dataset(
+        group=identification_group,
+        name="ceos_analysis_ready_data_document_identifier",
+        dimensions=(),
+        data="https://github.com/ceos-org/",
+        fillvalue=None,
+        description="CEOS Analysis Ready Data (CARD) document identifier",
+        attrs={"units": "unitless"},
+    )
+    # Gather the input dates and sensors in one pass over the CSLC files
+    input_dts = []
+    processing_dts = []
+    input_sensors: set[str] = set()
+    for f in pge_runconfig.input_file_group.cslc_file_list:
+        dates = _get_dates_cached(Path(f).name)
+        input_dts.append(dates[0])
+        if "compressed" in str(f).lower():
+            continue
+        processing_dts.append(dates[1])
+        sensor = parse_filename(f).get("sensor")
+        if sensor:
+            input_sensors.add(str(sensor))
+    input_dts.sort()
+    processing_dts.sort()
+
+    # CEOS: Section 1.5
+    create_dataset(
+        group=identification_group,
+        name="source_data_satellite_names",
+        dimensions=(),
+        data=",".join(input_sensors),
+        fillvalue=None,
+        description="Names of satellites included in input granules",
+        attrs={"units": "unitless"},
+    )
+    starting_date_str = input_dts[0].isoformat()
+    create_dataset(
+        group=identification_group,
+        name="source_data_earliest_acquisition",
+        dimensions=(),
+        data=starting_date_str,
+        fillvalue=None,
+        description="Datetime of earliest input granule used during processing",
+        attrs={"units": "unitless"},
+    )
+    last_date_str = input_dts[-1].isoformat()
+    create_dataset(
+        group=identification_group,
+        name="source_data_latest_acquisition",
+        dimensions=(),
+        data=last_date_str,
+        fillvalue=None,
+        description="Datetime of latest input granule used during processing",
+        attrs={"units": "unitless"},
+    )
+    early_processing_date_str = processing_dts[0].isoformat()
+    create_dataset(
+        group=identification_group,
+        name="source_data_earliest_processing_datetime",
+        dimensions=(),
+        data=early_processing_date_str,
+        fillvalue=None,
+        description="Earliest processing datetime of input granules",
+        attrs={"units": "unitless"},
+    )
+    last_processing_date_str = processing_dts[-1].isoformat()
+    create_dataset(
+        group=identification_group,
+        name="source_data_latest_processing_datetime",
+        dimensions=(),
+        data=last_processing_date_str,
+        fillvalue=None,
+        description="Latest processing datetime of input granules",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="ceos_number_of_input_granules",
+        dimensions=(),
+        data=len(pge_runconfig.input_file_group.cslc_file_list),
+        fillvalue=None,
+        description="Number of input data granule used during processing.",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_orbit_type",
+        dimensions=(),
+        data=orbit_type,
+        fillvalue=None,
+        description=(
+            "Type of orbit (precise, restituted) used during input data processing"
+        ),
+        attrs={"units": "unitless"},
+    )
 
-        # CEOS: Section 1.6.4 source acquisition parameters
-        _create_dataset(
-            group=identification_group,
-            name="acquisition_mode",
-            dimensions=(),
-            data="IW",
-            fillvalue=None,
-            description="Radar acquisition mode for input products",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="radar_center_frequency",
-            dimensions=(),
-            data=5405000454.33435,
-            fillvalue=None,
-            description="Radar center frequency of input products",
-            attrs={"units": "Hertz"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_polarization",
-            dimensions=(),
-            data="VV",
-            fillvalue=None,
-            description="Radar polarization of input products",
-            attrs={"units": "unitless"},
-        )
-        # CEOS: Section 1.6.7 source data attributes
-        _create_dataset(
-            group=identification_group,
-            name="source_data_original_institution",
-            dimensions=(),
-            data="European Space Agency",
-            fillvalue=None,
-            description="Original processing institution of Sentinel-1 SLC data",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_access",
-            dimensions=(),
-            data="https://search.asf.alaska.edu/#/?dataset=OPERA-S1&productTypes=CSLC",
-            fillvalue=None,
-            description=(
-                "The metadata identifies the location from where the source data can be"
-                " retrieved, expressed as a URL or DOI."
-            ),
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_file_list",
-            dimensions=(),
-            data=",".join(
-                p.stem for p in pge_runconfig.input_file_group.cslc_file_list
-            ),
-            fillvalue=None,
-            description=(
-                "List of input coregistered SLC granules used to create displacement"
-                " frame"
-            ),
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_range_resolutions",
-            dimensions=(),
-            data="[2.7, 3.1, 3.5]",
-            fillvalue=None,
-            description=(
-                "List of [IW1, IW2, IW3] range resolutions from source L1 Sentinel-1"
-                " SLCs"
-            ),
-            attrs={"units": "meters"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_azimuth_resolutions",
-            dimensions=(),
-            data="[22.5, 22.7, 22.6]",
-            fillvalue=None,
-            description=(
-                "List of [IW1, IW2, IW3] azimuth resolutions from L1 Sentinel-1 SLCs"
-            ),
-            attrs={"units": "meters"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_x_spacing",
-            dimensions=(),
-            data=5,
-            fillvalue=None,
-            description="Pixel spacing of source geocoded SLC data in the x-direction.",
-            attrs={"units": "meters"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_y_spacing",
-            dimensions=(),
-            data=10,
-            fillvalue=None,
-            description="Pixel spacing of source geocoded SLC data in the y-direction.",
-            attrs={"units": "meters"},
-        )
-        # Source for the max. NESZ:
-        # (https://sentinels.copernicus.eu/web/sentinel/user-guides/
-        # 1.6.9
-        _create_dataset(
-            group=identification_group,
-            name="source_data_max_noise_equivalent_sigma_zero",
-            dimensions=(),
-            data=-22.0,
-            fillvalue=None,
-            description="Maximum Noise equivalent sigma0 in dB",
-            attrs={"units": "dB"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="source_data_dem_name",
-            dimensions=(),
-            data="Copernicus GLO-30",
-            fillvalue=None,
-            description=(
-                "Name of Digital Elevation Model used during input data processing."
-            ),
-            attrs={"units": "dB"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="near_range_incidence_angle",
-            dimensions=(),
-            data=near_far_incidence_angles[0],
-            fillvalue=None,
-            description="Incidence angle at the near range of the displacement frame",
-            attrs={"units": "degrees"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="far_range_incidence_angle",
-            dimensions=(),
-            data=near_far_incidence_angles[1],
-            fillvalue=None,
-            description="Incidence angle at the far range of the displacement frame",
-            attrs={"units": "degrees"},
-        )
-        # CEOS: 1.7.3
-        _create_dataset(
-            group=identification_group,
-            name="product_sample_spacing",
-            dimensions=(),
-            data=30,
-            fillvalue=None,
-            description=(
-                "Spacing between adjacent X/Y samples of displacement product in UTM"
-                " coordinates"
-            ),
-            attrs={"units": "meters"},
-        )
-        # CEOS: 1.7.7
-        _create_dataset(
-            group=identification_group,
-            name="product_bounding_box",
-            dimensions=(),
-            data=",".join(map(str, product_bounds)),
-            fillvalue=None,
-            description=(
-                "Opposite corners of the product file in the UTM coordinates as (west,"
-                " south, east, north)"
-            ),
-            attrs={"units": "meters"},
-        )
-        _create_dataset(
-            group=identification_group,
-            name="product_data_access",
-            dimensions=(),
-            data=(
-                "https://search.asf.alaska.edu/#/?dataset=OPERA-S1&productTypes=DISP-S1"
-            ),
-            fillvalue=None,
-            description=(
-                "The metadata identifies the location from where the source data can be"
-                " retrieved, expressed as a URL or DOI."
-            ),
-            attrs={"units": "unitless"},
-        )
+    # CEOS: Section 1.6.4 source acquisition parameters
+    create_dataset(
+        group=identification_group,
+        name="acquisition_mode",
+        dimensions=(),
+        data="IW",
+        fillvalue=None,
+        description="Radar acquisition mode for input products",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="radar_center_frequency",
+        dimensions=(),
+        data=5405000454.33435,
+        fillvalue=None,
+        description="Radar center frequency of input products",
+        attrs={"units": "Hertz"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_polarization",
+        dimensions=(),
+        data="VV",
+        fillvalue=None,
+        description="Radar polarization of input products",
+        attrs={"units": "unitless"},
+    )
+    # CEOS: Section 1.6.7 source data attributes
+    create_dataset(
+        group=identification_group,
+        name="source_data_original_institution",
+        dimensions=(),
+        data="European Space Agency",
+        fillvalue=None,
+        description="Original processing institution of Sentinel-1 SLC data",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_access",
+        dimensions=(),
+        data="https://search.asf.alaska.edu/#/?dataset=OPERA-S1&productTypes=CSLC",
+        fillvalue=None,
+        description=(
+            "The metadata identifies the location from where the source data can be"
+            " retrieved, expressed as a URL or DOI."
+        ),
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_file_list",
+        dimensions=(),
+        data=",".join(p.stem for p in pge_runconfig.input_file_group.cslc_file_list),
+        fillvalue=None,
+        description=(
+            "List of input coregistered SLC granules used to create displacement"
+            " frame"
+        ),
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_range_resolutions",
+        dimensions=(),
+        data="[2.7, 3.1, 3.5]",
+        fillvalue=None,
+        description=(
+            "List of [IW1, IW2, IW3] range resolutions from source L1 Sentinel-1"
+            " SLCs"
+        ),
+        attrs={"units": "meters"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_azimuth_resolutions",
+        dimensions=(),
+        data="[22.5, 22.7, 22.6]",
+        fillvalue=None,
+        description=(
+            "List of [IW1, IW2, IW3] azimuth resolutions from L1 Sentinel-1 SLCs"
+        ),
+        attrs={"units": "meters"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_x_spacing",
+        dimensions=(),
+        data=5,
+        fillvalue=None,
+        description="Pixel spacing of source geocoded SLC data in the x-direction.",
+        attrs={"units": "meters"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_y_spacing",
+        dimensions=(),
+        data=10,
+        fillvalue=None,
+        description="Pixel spacing of source geocoded SLC data in the y-direction.",
+        attrs={"units": "meters"},
+    )
+    # Source for the max. NESZ:
+    # (https://sentinels.copernicus.eu/web/sentinel/user-guides/
+    # 1.6.9
+    create_dataset(
+        group=identification_group,
+        name="source_data_max_noise_equivalent_sigma_zero",
+        dimensions=(),
+        data=-22.0,
+        fillvalue=None,
+        description="Maximum Noise equivalent sigma0 in dB",
+        attrs={"units": "dB"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="source_data_dem_name",
+        dimensions=(),
+        data="Copernicus GLO-30",
+        fillvalue=None,
+        description=(
+            "Name of Digital Elevation Model used during input data processing."
+        ),
+        attrs={"units": "dB"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="near_range_incidence_angle",
+        dimensions=(),
+        data=near_far_incidence_angles[0],
+        fillvalue=None,
+        description="Incidence angle at the near range of the displacement frame",
+        attrs={"units": "degrees"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="far_range_incidence_angle",
+        dimensions=(),
+        data=near_far_incidence_angles[1],
+        fillvalue=None,
+        description="Incidence angle at the far range of the displacement frame",
+        attrs={"units": "degrees"},
+    )
+    # CEOS: 1.7.3
+    create_dataset(
+        group=identification_group,
+        name="product_sample_spacing",
+        dimensions=(),
+        data=30,
+        fillvalue=None,
+        description=(
+            "Spacing between adjacent X/Y samples of displacement product in UTM"
+            " coordinates"
+        ),
+        attrs={"units": "meters"},
+    )
+    # CEOS: 1.7.7
+    create_dataset(
+        group=identification_group,
+        name="product_bounding_box",
+        dimensions=(),
+        data=",".join(map(str, product_bounds)),
+        fillvalue=None,
+        description=(
+            "Opposite corners of the product file in the UTM coordinates as (west,"
+            " south, east, north)"
+        ),
+        attrs={"units": "meters"},
+    )
+    create_dataset(
+        group=identification_group,
+        name="product_data_access",
+        dimensions=(),
+        data=("https://search.asf.alaska.edu/#/?dataset=OPERA-S1&productTypes=DISP-S1"),
+        fillvalue=None,
+        description=(
+            "The metadata identifies the location from where the source data can be"
+            " retrieved, expressed as a URL or DOI."
+        ),
+        attrs={"units": "unitless"},
+    )
 
 
 def _create_metadata_group(
-    output_name: Filename,
+    f: h5netcdf.File,
     pge_runconfig: RunConfig,
     dolphin_config: DisplacementWorkflow,
+    store_as_attrs: bool = False,
 ) -> None:
     """Create the metadata group in the output file."""
-    with h5netcdf.File(output_name, "a") as f:
-        metadata_group = f.create_group(METADATA_GROUP_NAME)
-        _create_dataset(
-            group=metadata_group,
-            name="disp_s1_software_version",
-            dimensions=(),
-            data=disp_s1_version,
-            fillvalue=None,
-            description="Version of the disp-s1 software used to generate the product.",
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="dolphin_software_version",
-            dimensions=(),
-            data=dolphin_version,
-            fillvalue=None,
-            description="Version of the dolphin software used to generate the product.",
-        )
+    create_dataset = _set_scalar_attr if store_as_attrs else _create_dataset
+    metadata_group = f.create_group(METADATA_GROUP_NAME)
+    create_dataset(
+        group=metadata_group,
+        name="disp_s1_software_version",
+        dimensions=(),
+        data=disp_s1_version,
+        fillvalue=None,
+        description="Version of the disp-s1 software used to generate the product.",
+    )
+    create_dataset(
+        group=metadata_group,
+        name="dolphin_software_version",
+        dimensions=(),
+        data=dolphin_version,
+        fillvalue=None,
+        description="Version of the dolphin software used to generate the product.",
+    )
 
-        def _to_string(model: YamlModel):
-            ss = StringIO()
-            model.to_yaml(ss)
-            return "".join(c for c in ss.getvalue() if ord(c) < 128)
+    def _to_ascii(s: str) -> str:
+        # Drop any non-ASCII characters (using the codec, not a per-character loop)
+        return s.encode("ascii", errors="ignore").decode("ascii")
+
+    def _to_string(model: YamlModel):
+        ss = StringIO()
+        model.to_yaml(ss)
+        return _to_ascii(ss.getvalue())
+
+    create_dataset(
+        group=metadata_group,
+        name="pge_runconfig",
+        dimensions=(),
+        data=_to_string(pge_runconfig),
+        fillvalue=None,
+        description=("The full PGE runconfig YAML file used to generate the product."),
+    )
+    algo_param_path = (
+        pge_runconfig.dynamic_ancillary_file_group.algorithm_parameters_file
+    )
+    param_str = _to_ascii(algo_param_path.read_text())
+    create_dataset(
+        group=metadata_group,
+        name="algorithm_parameters_yaml",
+        dimensions=(),
+        data=param_str,
+        fillvalue=None,
+        description=("The full PGE runconfig YAML file used to generate the product."),
+    )
+    create_dataset(
+        group=metadata_group,
+        name="dolphin_workflow_config",
+        dimensions=(),
+        data=_to_string(dolphin_config),
+        fillvalue=None,
+        description=(
+            "The configuration parameters used by `dolphin` during the processing."
+        ),
+    )
+    # CEOS 1.7.10
+    create_dataset(
+        group=metadata_group,
+        name="product_pixel_coordinate_convention",
+        dimensions=(),
+        data="center",
+        fillvalue=None,
+        description="x/y coordinate convention referring to pixel center or corner",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="product_persistent_scatterer_selection_criteria",
+        dimensions=(),
+        data="Amplitude Dispersion",
+        fillvalue=None,
+        description="Name of persistent scatterer selection criteria",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="product_persistent_scatterer_selection_criteria_doi",
+        dimensions=(),
+        data="https://doi.org/10.1109/36.898661",
+        fillvalue=None,
+        description=(
+            "DOI of reference describing persistent scatterer selection criteria"
+        ),
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="phase_unwrapping_method",
+        dimensions=(),
+        data=str(dolphin_config.unwrap_options.unwrap_method),
+        fillvalue=None,
+        description="Name of phase unwrapping method",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="atmospheric_phase_correction",
+        dimensions=(),
+        data="None",
+        fillvalue=None,
+        description="Method used to correct for atmosphere phase noise.",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="ionospheric_phase_correction",
+        dimensions=(),
+        data="None",
+        fillvalue=None,
+        description="Method used to correct for ionospheric phase noise.",
+        attrs={"units": "unitless"},
+    )
+    create_dataset(
+        group=metadata_group,
+        name="ceos_noise_removal",
+        dimensions=(),
+        data="No",
+        fillvalue=None,
+        description=(
+            "Flag if noise removal* has been applied (Y/N). Metadata should include"
+            " the noise removal algorithm and reference to the algorithm as URL or"
+            " DOI."
+        ),
+        attrs={"units": "unitless"},
+    )
 
-        _create_dataset(
-            group=metadata_group,
-            name="pge_runconfig",
-            dimensions=(),
-            data=_to_string(pge_runconfig),
-            fillvalue=None,
-            description=(
-                "The full PGE runconfig YAML file used to generate the product."
-            ),
-        )
-        algo_param_path = (
-            pge_runconfig.dynamic_ancillary_file_group.algorithm_parameters_file
-        )
-        param_str = "".join(c for c in algo_param_path.read_text() if ord(c) < 128)
-        _create_dataset(
-            group=metadata_group,
-            name="algorithm_parameters_yaml",
-            dimensions=(),
-            data=param_str,
-            fillvalue=None,
-            description=(
-                "The full PGE runconfig YAML file used to generate the product."
-            ),
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="dolphin_workflow_config",
-            dimensions=(),
-            data=_to_string(dolphin_config),
-            fillvalue=None,
-            description=(
-                "The configuration parameters used by `dolphin` during the processing."
-            ),
-        )
-        # CEOS 1.7.10
-        _create_dataset(
-            group=metadata_group,
-            name="product_pixel_coordinate_convention",
-            dimensions=(),
-            data="center",
-            fillvalue=None,
-            description="x/y coordinate convention referring to pixel center or corner",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="product_persistent_scatterer_selection_criteria",
-            dimensions=(),
-            data="Amplitude Dispersion",
-            fillvalue=None,
-            description="Name of persistent scatterer selection criteria",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="product_persistent_scatterer_selection_criteria_doi",
-            dimensions=(),
-            data="https://doi.org/10.1109/36.898661",
-            fillvalue=None,
-            description=(
-                "DOI of reference describing persistent scatterer selection criteria"
-            ),
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="phase_unwrapping_method",
-            dimensions=(),
-            data=str(dolphin_config.unwrap_options.unwrap_method),
-            fillvalue=None,
-            description="Name of phase unwrapping method",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="atmospheric_phase_correction",
-            dimensions=(),
-            data="None",
-            fillvalue=None,
-            description="Method used to correct for atmosphere phase noise.",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="ionospheric_phase_correction",
-            dimensions=(),
-            data="None",
-            fillvalue=None,
-            description="Method used to correct for ionospheric phase noise.",
-            attrs={"units": "unitless"},
-        )
-        _create_dataset(
-            group=metadata_group,
-            name="ceos_noise_removal",
-            dimensions=(),
-            data="No",
-            fillvalue=None,
-            description=(
-                "Flag if noise removal* has been applied (Y/N). Metadata should include"
-                " the noise removal algorithm and reference to the algorithm as URL or"
-                " DOI."
-            ),
-            attrs={"units": "unitless"},
-        )
 
+def _average_valid_pixels(arr: np.ndarray, is_valid: np.ndarray) -> float:
+    """Get the same average of `arr` as the masked `arr.mean()`.
 
-def _get_orbit_direction(cslc_filename: Filename) -> Literal["ascending", "descending"]:
-    with h5py.File(cslc_filename) as hf:
-        out = hf["/identification/orbit_pass_direction"][()]
-        if isinstance(out, bytes):
-            out = out.decode("utf-8")
+    Averages the raw data over the `is_valid` pixels, which avoids the
+    zero-filled copy made by the masked mean (the float64 accumulator is only a
+    scalar). With no valid pixels, this is 0.0, which is how the `masked`
+    constant returned by the masked mean is written to the product.
+    """
+    if not is_valid.any():
+        return 0.0
+    return float(np.mean(np.ma.getdata(arr), where=is_valid, dtype=np.float64))
+
+
+def _masked_predicate(
+    ufunc: np.ufunc, arr: np.ndarray, value: float, out: np.ndarray
+) -> np.ndarray:
+    """Evaluate `ufunc(arr, value)` into `out`, counting masked pixels as True.
+
+    Equivalent to `ufunc(arr.filled(0), value)` for the predicates used in the
+    recommended mask, without allocating the filled copy.
+    """
+    ufunc(np.ma.getdata(arr), value, out=out)
+    mask = np.ma.getmask(arr)
+    if mask is not np.ma.nomask:
+        out |= mask
     return out
 
 
-def _get_orbit_type(
-    cslc_filename: Filename,
-) -> Literal["precise orbit file", "restituted orbit file"]:
-    with h5py.File(cslc_filename) as hf:
-        out = hf["/quality_assurance/orbit_information/orbit_type"][()]
+class _CslcMetadata(NamedTuple):
+    """Scalar metadata read from one OPERA CSLC file."""
+
+    zero_doppler_start_time: datetime.datetime
+    zero_doppler_end_time: datetime.datetime
+    radar_wavelength: float
+    orbit_direction: Literal["ascending", "descending"]
+    orbit_type: Literal["precise orbit file", "restituted orbit file"]
+
+
+def _extract_cslc_metadata(cslc_filename: Filename) -> _CslcMetadata:
+    """Read the scalar metadata used in the product with one file open.
+
+    Results are cached on (path, modification time), since the same reference
+    CSLCs are used for many products.
+    """
+    path = os.fspath(cslc_filename)
+    return _read_cslc_metadata(path, Path(path).stat().st_mtime)
+
+
+@functools.lru_cache(maxsize=64)
+def _read_cslc_metadata(cslc_filename: str, _mtime: float) -> _CslcMetadata:
+    # `_mtime` is only part of the cache key, so modified files are re-read
+
+    def _read_str(hf: h5py.File, dset: str) -> Any:
+        out = hf[dset][()]
         if isinstance(out, bytes):
             out = out.decode("utf-8")
-    return out
+        return out
+
+    def _read_time(hf: h5py.File, dset: str) -> datetime.datetime:
+        # As in `opera_utils.get_zero_doppler_time`, the [:26] drops any
+        # fractional digits past microseconds, which `strptime` can't parse
+        time_str = _read_str(hf, dset)[:26]
+        return datetime.datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S.%f")
+
+    with h5py.File(cslc_filename, "r") as hf:
+        return _CslcMetadata(
+            zero_doppler_start_time=_read_time(
+                hf, "/identification/zero_doppler_start_time"
+            ),
+            zero_doppler_end_time=_read_time(
+                hf, "/identification/zero_doppler_end_time"
+            ),
+            radar_wavelength=hf[
+                "/metadata/processing_information/input_burst_metadata/wavelength"
+            ][()],
+            orbit_direction=_read_str(hf, "/identification/orbit_pass_direction"),
+            orbit_type=_read_str(hf, "/quality_assurance/orbit_information/orbit_type"),
+        )
 
 
 def _create_dataset(
@@ -1133,12 +1278,13 @@ def _create_dataset(
     group: h5netcdf.Group,
     name: str,
     dimensions: Optional[Sequence[str]],
-    data: Union[np.ndarray, str],
+    data: Union[np.ndarray, np.generic, str, float, None],
     description: str,
     fillvalue: Optional[float],
     long_name: str | None = None,
     attrs: Optional[dict[str, Any]] = None,
     dtype: Optional[DTypeLike] = None,
+    hdf5_options: Optional[Mapping[str, Any]] = None,
 ) -> h5netcdf.Variable:
     if attrs is None:
         attrs = {}
@@ -1146,12 +1292,12 @@ def _create_dataset(
     if long_name:
         attrs["long_name"] = long_name
 
-    options = HDF5_OPTS
+    options = HDF5_OPTS if hdf5_options is None else hdf5_options
     if isinstance(data, str):
         options = {}
         # This is a string, so we need to convert it to bytes or it will fail
         data = np.bytes_(data)
-    elif np.array(data).size <= 1:
+    elif _is_scalar(data):
         # Scalars don't need chunks/compression
         options = {}
     dset = group.create_variable(
@@ -1166,11 +1312,69 @@ def _create_dataset(
     return dset
 
 
+# The same CSLC lists are parsed when creating the compressed SLC products and
+# the displacement products' metadata, so only run the filename regexes once.
+# Callers pass only the file name, so parent directories never affect the parse.
+@functools.lru_cache(maxsize=2048)
+def _get_dates_cached(file_name: str) -> tuple[datetime.datetime, ...]:
+    return tuple(get_dates(file_name))
+
+
+@functools.lru_cache(maxsize=2048)
+def _get_burst_id_cached(file_name: str) -> str:
+    return get_burst_id(file_name)
+
+
+def _is_scalar(data: Any) -> bool:
+    # Check the common types first to avoid building a throwaway array
+    if isinstance(data, (int, float, complex, np.generic)):
+        return True
+    if data is None:
+        return False
+    if isinstance(data, np.ndarray):
+        return data.size <= 1
+    return np.size(data) <= 1
+
+
+def _set_scalar_attr(
+    *,
+    group: h5netcdf.Group,
+    name: str,
+    data: Union[np.ndarray, np.generic, str, float, None],
+    description: str,
+    long_name: str | None = None,
+    attrs: Optional[dict[str, Any]] = None,
+    **kwargs,
+) -> None:
+    """Store a scalar value as an attribute of `group` instead of a dataset.
+
+    The dataset's own attributes are kept as `{name}_{key}` group attributes,
+    e.g. `frame_id_description`.
+    Non-scalar values are still written with `_create_dataset`.
+    """
+    if not (isinstance(data, str) or _is_scalar(data)):
+        _create_dataset(
+            group=group,
+            name=name,
+            data=data,
+            description=description,
+            long_name=long_name,
+            attrs=attrs,
+            **kwargs,
+        )
+        return
+    dset_attrs = {"description": description, **(attrs or {})}
+    if long_name:
+        dset_attrs["long_name"] = long_name
+    group.attrs[name] = data
+    group.attrs.update({f"{name}_{key}": value for key, value in dset_attrs.items()})
+
+
 def _create_geo_dataset(
     *,
     group: h5netcdf.Group,
     name: str,
-    data: np.ndarray,
+    data: Optional[ArrayLike],
     long_name: str,
     description: str,
     fillvalue: float,
@@ -1179,25 +1383,202 @@ def _create_geo_dataset(
     x_name: str = "x",
     y_name: str = "y",
     grid_mapping_dset_name=GRID_MAPPING_DSET,
+    dtype: Optional[DTypeLike] = None,
+    hdf5_options: Optional[Mapping[str, Any]] = None,
 ) -> h5netcdf.Variable:
+    arr = None if data is None else np.asanyarray(data)
     if include_time:
         dimensions = ["time", y_name, x_name]
-        if data.ndim == 2:
-            data = data[np.newaxis, :, :]
+        if arr is not None and arr.ndim == 2:
+            arr = arr[np.newaxis, :, :]
     else:
         dimensions = [y_name, x_name]
-    dset = _create_dataset(
+    # Set the grid mapping along with the other attributes at creation
+    attrs = {**(attrs or {}), "grid_mapping": grid_mapping_dset_name}
+    return _create_dataset(
         group=group,
         name=name,
         dimensions=dimensions,
-        data=data,
+        data=arr,
         long_name=long_name,
         description=description,
         fillvalue=fillvalue,
         attrs=attrs,
+        dtype=dtype,
+        hdf5_options=hdf5_options,
     )
-    dset.attrs["grid_mapping"] = grid_mapping_dset_name
-    return dset
+
+
+def _chunk_cache_opts(cols: int, itemsize: int = 4) -> dict[str, int]:
+    """Get `h5py.File` chunk cache options for writing rasters `cols` pixels wide.
+
+    The cache holds at least two full rows of chunks (of `itemsize` bytes per
+    pixel), so that writes moving down the raster never evict partially
+    written chunks.
+    """
+    chunks_per_row = -(-cols // CHUNK_SHAPE[1])
+    row_bytes = chunks_per_row * CHUNK_SHAPE[0] * CHUNK_SHAPE[1] * itemsize
+    return {
+        "rdcc_nbytes": max(MIN_CHUNK_CACHE_BYTES, 2 * row_bytes),
+        # Number of hash table slots: a prime, well above the number of chunks
+        "rdcc_nslots": 100_003,
+    }
+
+
+def _get_h5py_object(
+    obj: Union[h5netcdf.File, h5netcdf.Variable],
+) -> Union[h5py.File, h5py.Dataset]:
+    """Get the h5py file or dataset underlying an h5netcdf file or variable.
+
+    h5netcdf doesn't expose these publicly, so this is the one place relying on
+    its private `File._h5file` and `Variable._h5ds` attributes (as of h5netcdf 1.8.1).
+    """
+    if isinstance(obj, h5netcdf.File):
+        return obj._h5file
+    return obj._h5ds
+
+
+def _enlarge_metadata_cache(
+    fid: h5py.h5f.FileID, nbytes: int = METADATA_CACHE_BYTES
+) -> None:
+    """Start the metadata cache of an open HDF5 file at a fixed, larger size."""
+    config = fid.get_mdc_config()
+    config.set_initial_size = True
+    config.initial_size = nbytes
+    config.max_size = max(config.max_size, nbytes)
+    # Keep the size fixed, rather than letting the adaptive resizing shrink it
+    # (0 is H5C_incr__off, H5C_flash_incr__off and H5C_decr__off, respectively)
+    config.incr_mode = 0
+    config.flash_incr_mode = 0
+    config.decr_mode = 0
+    fid.set_mdc_config(config)
+
+
+def _write_raster_by_strips(
+    dset: h5netcdf.Variable,
+    filename: Filename,
+    dtype: DTypeLike,
+    keep_bits: Optional[int] = None,
+) -> None:
+    """Copy the first band of `filename` into `dset` in chunk-aligned row strips.
+
+    Each write covers whole HDF5 chunks along the rows. The next strip is read
+    (and converted) in a background thread while the current one is compressed
+    and written, so at most two strips are held in memory at a time.
+    If enabled with `DISP_S1_DIRECT_CHUNK_WRITES`, the chunks of each strip of a
+    gzip-compressed dataset are compressed in parallel threads and written
+    directly, bypassing HDF5's filter pipeline.
+    """
+    from osgeo import gdal
+
+    ds = gdal.Open(os.fspath(filename))
+    band = ds.GetRasterBand(1)
+    xsize, ysize = ds.RasterXSize, ds.RasterYSize
+    strip_rows = CHUNK_SHAPE[0]
+    deflate_level = None
+    if _direct_chunk_writes_enabled():
+        h5ds = _get_h5py_object(dset)
+        deflate_level = _get_direct_chunk_deflate_level(h5ds, strip_rows)
+
+    def _read_strip(row_start: int) -> np.ndarray:
+        nrows = min(strip_rows, ysize - row_start)
+        strip = band.ReadAsArray(0, row_start, xsize, nrows)
+        # Skip the copy when GDAL's native type already matches
+        if strip.dtype != dtype:
+            strip = strip.astype(dtype)
+        if keep_bits is not None:
+            round_mantissa(strip, keep_bits=keep_bits)
+        return strip
+
+    with (
+        ThreadPoolExecutor(max_workers=1) as reader,
+        ThreadPoolExecutor(max_workers=COMPRESSION_THREADS) as compressor,
+    ):
+        next_strip = reader.submit(_read_strip, 0)
+        for row_start in range(0, ysize, strip_rows):
+            strip = next_strip.result()
+            if row_start + strip_rows < ysize:
+                next_strip = reader.submit(_read_strip, row_start + strip_rows)
+            if deflate_level is None:
+                dset[row_start : row_start + strip.shape[0], :] = strip
+            else:
+                _write_strip_direct_chunks(
+                    h5ds, row_start, strip, deflate_level, compressor
+                )
+    ds = band = None
+
+
+def _direct_chunk_writes_enabled() -> bool:
+    """Check if `DISP_S1_DIRECT_CHUNK_WRITES` opts in to direct chunk writes."""
+    value = os.environ.get(DIRECT_CHUNK_ENV_VAR, "0").lower()
+    return value in ("1", "true")
+
+
+def _get_direct_chunk_deflate_level(
+    h5ds: h5py.Dataset, strip_rows: int
+) -> Optional[int]:
+    """Get the gzip level to pre-compress chunks of `h5ds` with, if supported.
+
+    Returns None (meaning: write through HDF5 normally) unless `h5ds` is a 2D
+    dataset with (optionally shuffled) gzip compression, whose chunk rows line up
+    with strips of `strip_rows` rows.
+    """
+    if (
+        h5ds.ndim != 2
+        or h5ds.chunks is None
+        or h5ds.chunks[0] != strip_rows
+        or h5ds.compression != "gzip"
+        or h5ds.fletcher32
+        or h5ds.scaleoffset is not None
+    ):
+        return None
+    return h5ds.compression_opts
+
+
+def _compress_chunk(chunk: np.ndarray, deflate_level: int, shuffle: bool) -> bytes:
+    """Apply HDF5's shuffle (if used) and deflate filters to one full chunk."""
+    buf = np.ascontiguousarray(chunk)
+    if shuffle:
+        # Byte shuffle: store the i-th byte of every element together
+        buf = np.ascontiguousarray(buf.view(np.uint8).reshape(-1, buf.itemsize).T)
+    # (zlib releases the GIL while compressing)
+    return zlib.compress(buf.data, deflate_level)
+
+
+def _write_strip_direct_chunks(
+    h5ds: h5py.Dataset,
+    row_start: int,
+    strip: np.ndarray,
+    deflate_level: int,
+    executor: ThreadPoolExecutor,
+) -> None:
+    """Compress the chunks of one row strip in parallel and write them directly."""
+    # The raw bytes are stored as-is, so a mismatched type would silently corrupt
+    # the dataset rather than being converted by HDF5
+    if strip.dtype != h5ds.dtype:
+        msg = f"Strip has dtype {strip.dtype}, but {h5ds.name} has {h5ds.dtype}"
+        raise ValueError(msg)
+    chunk_rows, chunk_cols = h5ds.chunks
+    nrows, ncols = strip.shape
+    if nrows < chunk_rows:
+        # Edge chunks are stored at full size: pad them with the fill value
+        padded = np.full((chunk_rows, ncols), h5ds.fillvalue, dtype=strip.dtype)
+        padded[:nrows] = strip
+        strip = padded
+    col_starts = range(0, ncols, chunk_cols)
+
+    def _compress(col_start: int) -> bytes:
+        chunk = strip[:, col_start : col_start + chunk_cols]
+        if chunk.shape[1] < chunk_cols:
+            padded = np.full(
+                (chunk_rows, chunk_cols), h5ds.fillvalue, dtype=strip.dtype
+            )
+            padded[:, : chunk.shape[1]] = chunk
+            chunk = padded
+        return _compress_chunk(chunk, deflate_level, shuffle=h5ds.shuffle)
+
+    for col_start, compressed in zip(col_starts, executor.map(_compress, col_starts)):
+        h5ds.id.write_direct_chunk((row_start, col_start), compressed)
 
 
 def _create_yx_arrays(
@@ -1211,8 +1592,10 @@ def _create_yx_arrays(
     # Make the x/y arrays
     # Note that these are the center of the pixels, whereas the GeoTransform
     # is the upper left corner of the top left pixel.
-    y = np.arange(y_origin + y_res / 2, y_origin + y_res * ysize, y_res)
-    x = np.arange(x_origin + x_res / 2, x_origin + x_res * xsize, x_res)
+    # (`linspace` guarantees `ysize`/`xsize` points, where `arange` with a float
+    # step can give one more or less from rounding at the endpoint)
+    y = np.linspace(y_origin + y_res / 2, y_origin + y_res * (ysize - 0.5), ysize)
+    x = np.linspace(x_origin + x_res / 2, x_origin + x_res * (xsize - 0.5), xsize)
     return y, x
 
 
@@ -1276,7 +1659,15 @@ def _create_time_array(times: list[datetime.datetime]):
     # 'units': 'seconds since 2017-02-03 00:00:00.000000'
     # Create the time array
     since_time = times[0]
-    time = np.array([(t - since_time).total_seconds() for t in times])
+    if len(times) == 1:
+        # Single time (the common case): the offset from itself is 0
+        time = np.zeros(1)
+    else:
+        time = np.fromiter(
+            ((t - since_time).total_seconds() for t in times),
+            dtype=np.float64,
+            count=len(times),
+        )
     calendar = "standard"
     units = f"seconds since {since_time.strftime(DATETIME_FORMAT)}"
     return time, calendar, units
@@ -1322,80 +1713,162 @@ def process_compressed_slc(info: CompressedSLCInfo) -> Path:
     if outname.exists():
         logger.info(f"Skipping existing {outname}")
 
-    crs = io.get_raster_crs(comp_slc_file)
-    gt = io.get_raster_gt(comp_slc_file)
-    data = io.load_gdal(comp_slc_file, band=1)
-    # COMPASS used `truncate_mantissa` default, 10 bits
-    round_mantissa(data, keep_bits=10)
-
-    # Input metadata is stored within the GDAL "DOLPHIN" domain
-    metadata_dict = io.get_raster_metadata(comp_slc_file, "DOLPHIN")
-    attrs = {"units": "unitless"}
-    attrs.update(metadata_dict)
-
-    *parts, dset_name = OPERA_DATASET_NAME.split("/")
-    dispersion_dset_name = "amplitude_dispersion"
-    group_name = "/".join(parts)
-    logger.info(f"Writing {outname}")
-    with h5py.File(outname, "w") as hf:
-        # add type to root for GDAL recognition of complex datasets in NetCDF
-        ctype = h5py.h5t.py_create(np.complex64)
-        ctype.commit(hf["/"].id, np.bytes_("complex64"))
-
-    # COMPASS used "_coordinates" instead of "x"/"y"
-    x_name, y_name = "x_coordinates", "y_coordinates"
-    grid_mapping_dset_name = "projection"
-    with h5netcdf.File(outname, mode="a", invalid_netcdf=True) as f:
-        f.attrs.update(attrs)
-
-        data_group = f.create_group(group_name)
-        # COMPASS used "projection" instead of "spatial_ref"
-        _create_grid_mapping(
-            group=data_group, crs=crs, gt=gt, name=grid_mapping_dset_name
-        )
-        _create_yx_dsets(
-            group=data_group,
-            gt=gt,
-            shape=data.shape,
-            include_time=False,
-            x_name=x_name,
-            y_name=y_name,
-        )
-        _create_geo_dataset(
-            group=data_group,
-            name=dset_name,
-            data=data,
-            long_name="Compressed SLC",
-            description="Compressed SLC product",
-            fillvalue=np.nan + 0j,
-            attrs=attrs,
-            x_name=x_name,
-            y_name=y_name,
-            grid_mapping_dset_name=grid_mapping_dset_name,
-        )
-        del data
+    # Read (and round) the amplitude dispersion (band 2) in the background while
+    # band 1 is loaded and written: GDAL releases the GIL during reads.
+    # (If writing fails, leaving the `with` still waits for the read to finish.)
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        amp_dispersion_future = reader.submit(
+            _load_real_band_float32, comp_slc_file, band=2, keep_bits=10
+        )
+
+        crs = io.get_raster_crs(comp_slc_file)
+        gt = io.get_raster_gt(comp_slc_file)
+        cols, rows = io.get_raster_xysize(comp_slc_file)
+        shape = (rows, cols)
+
+        # Input metadata is stored within the GDAL "DOLPHIN" domain
+        metadata_dict = io.get_raster_metadata(comp_slc_file, "DOLPHIN")
+        attrs = {"units": "unitless"}
+        attrs.update(metadata_dict)
+
+        *parts, dset_name = OPERA_DATASET_NAME.split("/")
+        dispersion_dset_name = "amplitude_dispersion"
+        group_name = "/".join(parts)
+        logger.info(f"Writing {outname}")
+        # COMPASS used "_coordinates" instead of "x"/"y"
+        x_name, y_name = "x_coordinates", "y_coordinates"
+        grid_mapping_dset_name = "projection"
+        cache_opts = _chunk_cache_opts(cols, itemsize=np.dtype(np.complex64).itemsize)
+        hdf5_options = _get_compressed_slc_hdf5_options()
+        with (
+            h5py.File(outname, "w", **cache_opts) as hf,
+            # Write the NetCDF parts through the same open file
+            h5netcdf.File(hf, mode="a", invalid_netcdf=True) as f,
+        ):
+            # add type to root for GDAL recognition of complex datasets in NetCDF
+            ctype = h5py.h5t.py_create(np.complex64)
+            ctype.commit(hf["/"].id, np.bytes_("complex64"))
+
+            f.attrs.update(attrs)
+
+            data_group = f.create_group(group_name)
+            # COMPASS used "projection" instead of "spatial_ref"
+            _create_grid_mapping(
+                group=data_group, crs=crs, gt=gt, name=grid_mapping_dset_name
+            )
+            _create_yx_dsets(
+                group=data_group,
+                gt=gt,
+                shape=shape,
+                include_time=False,
+                x_name=x_name,
+                y_name=y_name,
+            )
+            slc_dset = _create_geo_dataset(
+                group=data_group,
+                name=dset_name,
+                data=None,
+                dtype=np.complex64,
+                long_name="Compressed SLC",
+                description="Compressed SLC product",
+                fillvalue=np.nan + 0j,
+                attrs=attrs,
+                x_name=x_name,
+                y_name=y_name,
+                grid_mapping_dset_name=grid_mapping_dset_name,
+                hdf5_options=hdf5_options,
+            )
+            # Stream band 1 in chunk-aligned strips, rounding each strip just before
+            # it's written, instead of loading and rounding the whole array first.
+            # COMPASS used `truncate_mantissa` default, 10 bits
+            _write_raster_by_strips(
+                slc_dset, comp_slc_file, dtype=np.complex64, keep_bits=10
+            )
 
-        # Add the amplitude dispersion
-        amp_dispersion_data = io.load_gdal(comp_slc_file, band=2).real.astype("float32")
-        round_mantissa(amp_dispersion_data, keep_bits=10)
-        _create_geo_dataset(
-            group=data_group,
-            name=dispersion_dset_name,
-            data=amp_dispersion_data,
-            long_name="Amplitude Dispersion",
-            description="Amplitude dispersion for the compressed SLC files.",
-            fillvalue=np.nan,
-            attrs={"units": "unitless"},
-            x_name=x_name,
-            y_name=y_name,
-            grid_mapping_dset_name=grid_mapping_dset_name,
-        )
+            # Add the amplitude dispersion
+            amp_dispersion_data = amp_dispersion_future.result()
+            _create_geo_dataset(
+                group=data_group,
+                name=dispersion_dset_name,
+                data=amp_dispersion_data,
+                long_name="Amplitude Dispersion",
+                description="Amplitude dispersion for the compressed SLC files.",
+                fillvalue=np.nan,
+                attrs={"units": "unitless"},
+                x_name=x_name,
+                y_name=y_name,
+                grid_mapping_dset_name=grid_mapping_dset_name,
+                hdf5_options=hdf5_options,
+            )
 
     copy_cslc_metadata_to_compressed(opera_cslc_file, outname)
 
     return outname
 
 
+def _get_compressed_slc_hdf5_options() -> dict[str, Any]:
+    """Get the dataset creation options for compressed SLC rasters.
+
+    Uses `HDF5_OPTS` (gzip) unless the `DISP_S1_COMPRESSION` environment
+    variable is set to "zstd" and `hdf5plugin` is installed.
+    """
+    compression = os.environ.get(COMPRESSION_ENV_VAR, "gzip").lower()
+    if compression == "gzip":
+        return HDF5_OPTS
+    if compression != "zstd":
+        msg = f"{COMPRESSION_ENV_VAR} must be 'gzip' or 'zstd', got {compression!r}"
+        raise ValueError(msg)
+    try:
+        import hdf5plugin
+    except ImportError:
+        logger.warning(
+            f"{COMPRESSION_ENV_VAR}=zstd requires `hdf5plugin`: falling back to gzip"
+        )
+        return HDF5_OPTS
+
+    options = {
+        k: v
+        for k, v in HDF5_OPTS.items()
+        if k not in ("compression", "compression_opts", "shuffle")
+    }
+    # Shuffle still comes before Zstd in the filter pipeline
+    return {**options, **hdf5plugin.Zstd(clevel=3), "shuffle": True}
+
+
+def _load_real_band_float32(
+    filename: Filename, band: int, keep_bits: Optional[int] = None
+) -> np.ndarray:
+    """Load the real part of one (complex) raster band as float32.
+
+    If `keep_bits` is passed, the mantissa of each block of rows is rounded
+    right after it's read, while it's still in the CPU cache, rather than in a
+    second pass over the full array.
+    """
+    from osgeo import gdal
+
+    # GDAL converts the complex band to its real part as it reads, so there's
+    # no complex64 intermediate to take `.real` of and copy
+    ds = gdal.Open(os.fspath(filename))
+    gdal_band = ds.GetRasterBand(band)
+    xsize, ysize = ds.RasterXSize, ds.RasterYSize
+    out = np.empty((ysize, xsize), dtype=np.float32)
+    block_rows = CHUNK_SHAPE[0]
+    for row_start in range(0, ysize, block_rows):
+        block = out[row_start : row_start + block_rows]
+        gdal_band.ReadAsArray(
+            0,
+            row_start,
+            xsize,
+            block.shape[0],
+            buf_type=gdal.GDT_Float32,
+            buf_obj=block,
+        )
+        if keep_bits is not None:
+            round_mantissa(block, keep_bits=keep_bits)
+    ds = gdal_band = None
+    return out
+
+
 def _copy_hdf5_dsets(
     source_file: Filename,
     dest_file: Filename,
@@ -1404,26 +1877,48 @@ def _copy_hdf5_dsets(
     error_on_missing: bool = False,
 ) -> None:
     with h5py.File(source_file, "r") as src, h5py.File(dest_file, "a") as dst:
-        for dset_path in dsets_to_copy:
-            if dset_path not in src:
-                msg = f"Dataset or group {dset_path} not found in {source_file}"
-                if error_on_missing:
-                    raise ValueError(msg)
-                else:
-                    logger.warning(msg)
-                    continue
+        _copy_hdf5_objects(
+            src,
+            dst,
+            dsets_to_copy,
+            prepend_str=prepend_str,
+            error_on_missing=error_on_missing,
+        )
+
 
-            # Create parent group if it doesn't exist
-            out_group = str(Path(dset_path).parent)
-            dst.require_group(out_group)
+def _copy_hdf5_objects(
+    src: h5py.File,
+    dst: h5py.File,
+    dsets_to_copy: Iterable[str],
+    prepend_str: str = "",
+    error_on_missing: bool = False,
+) -> None:
+    # Look up/create each destination parent group once, rather than for every
+    # dataset copied into it
+    out_groups: dict[str, h5py.Group] = {}
+    for dset_path in dsets_to_copy:
+        if dset_path not in src:
+            msg = f"Dataset or group {dset_path} not found in {src.filename}"
+            if error_on_missing:
+                raise ValueError(msg)
+            else:
+                logger.warning(msg)
+                continue
+
+        # Create parent group if it doesn't exist
+        parent, _, name = dset_path.rpartition("/")
+        parent = parent or "/"
+        if parent not in out_groups:
+            out_groups[parent] = dst.require_group(parent)
+        out_group = out_groups[parent]
 
-            # Remove existing dataset/group if it exists
-            if dset_path in dst:
-                del dst[dset_path]
+        # Remove existing dataset/group if it exists
+        new_name = f"{prepend_str}{name}"
+        if name in out_group:
+            del out_group[name]
 
-            # Copy the dataset or group
-            new_name = f"{prepend_str}{Path(dset_path).name}"
-            src.copy(src[dset_path], dst[str(Path(dset_path).parent)], name=new_name)
+        # Copy the dataset or group
+        src.copy(src[dset_path], out_group, name=new_name)
 
 
 def copy_cslc_metadata_to_compressed(
@@ -1475,16 +1970,6 @@ def copy_cslc_metadata_to_displacement(
     dsets_to_copy = [
         "/metadata/orbit",  #          Group
     ]
-    for cslc_file, prepend_str in zip(
-        [reference_cslc_file, secondary_cslc_file], ["reference_", "secondary_"]
-    ):
-        _copy_hdf5_dsets(
-            source_file=cslc_file,
-            dest_file=output_disp_file,
-            dsets_to_copy=dsets_to_copy,
-            prepend_str=prepend_str,
-        )
-
     # Add ones which should be same for both ref/sec
     common_dsets = [
         "/identification/mission_id",
@@ -1500,11 +1985,17 @@ def copy_cslc_metadata_to_displacement(
         "/metadata/processing_information/algorithms/ISCE3_version",
         "/metadata/processing_information/algorithms/s1_reader_version",
     ]
-    _copy_hdf5_dsets(
-        source_file=reference_cslc_file,
-        dest_file=output_disp_file,
-        dsets_to_copy=common_dsets,
-    )
+    # Open the output (with a page buffer, since it uses the "page" strategy) and
+    # each input CSLC once for all the copies
+    with (
+        h5py.File(output_disp_file, "a", page_buf_size=PAGE_BUF_SIZE) as dst,
+        h5py.File(reference_cslc_file, "r") as ref_src,
+        h5py.File(secondary_cslc_file, "r") as sec_src,
+    ):
+        _enlarge_metadata_cache(dst.id)
+        for src, prepend_str in zip([ref_src, sec_src], ["reference_", "secondary_"]):
+            _copy_hdf5_objects(src, dst, dsets_to_copy, prepend_str=prepend_str)
+        _copy_hdf5_objects(ref_src, dst, common_dsets)
 
 
 def create_compressed_products(
@@ -1534,14 +2025,31 @@ def create_compressed_products(
     list[Path]
         Paths to output compressed SLC files
 
+    Notes
+    -----
+    Where the "forkserver" start method is available, this sets its preloaded
+    modules (``h5py``, ``h5netcdf`` and ``numpy``). This is process-wide: it also
+    applies to any other forkserver started later by the calling process.
+
     """
+    # Index the CSLCs by (date, burst ID) once, instead of scanning the full list
+    # for every compressed SLC. A file is listed under each date in its name.
+    # Only parse the file names, so parent directories can't add false matches.
+    date_burst_to_cslcs: defaultdict[tuple[datetime.datetime, str], list[Path]] = (
+        defaultdict(list)
+    )
+    for cslc_file in cslc_file_list:
+        cslc_name = Path(cslc_file).name
+        cslc_burst_id = _get_burst_id_cached(cslc_name)
+        for d in dict.fromkeys(_get_dates_cached(cslc_name)):
+            date_burst_to_cslcs[(d, cslc_burst_id)].append(cslc_file)
+
     compressed_slc_infos = []
     for burst_id, comp_slc_files in comp_slc_dict.items():
         for comp_slc_file in comp_slc_files:
             # Pick out the one that matches the current date/burst_id
-            ref_date = get_dates(comp_slc_file)[0]
-            valid_date_files = filter_by_date(cslc_file_list, [ref_date])
-            matching_files = filter_by_burst_id(valid_date_files, burst_id)
+            ref_date = _get_dates_cached(Path(comp_slc_file).name)[0]
+            matching_files = date_burst_to_cslcs.get((ref_date, burst_id), [])
             msg = (
                 f"Found {len(matching_files)} matching CSLC files for"
                 f" {burst_id} {ref_date}"
@@ -1556,12 +2064,28 @@ def create_compressed_products(
     executor_class = (
         ProcessPoolExecutor if max_workers > 1 else DummyProcessPoolExecutor
     )
-    ctx = get_context("spawn")
+    # Where available, workers are forked from a clean server process which has
+    # already imported the HDF5 modules, rather than each one re-importing them.
+    # (GDAL is left out, so it's never loaded in the server process.)
+    # Otherwise, use "spawn" like the rest of the workflow.
+    ctx: BaseContext
+    if "forkserver" in get_all_start_methods():
+        ctx = get_context("forkserver")
+        # (This changes the preload list process-wide, see the Notes above)
+        ctx.set_forkserver_preload(["h5py", "h5netcdf", "numpy"])
+    else:
+        ctx = get_context("spawn")
+    # Hand each worker a few products at a time to cut the IPC round trips
+    chunksize = max(1, len(compressed_slc_infos) // (max_workers * 4))
     with executor_class(
         max_workers=max_workers,
         mp_context=ctx,
     ) as executor:
-        results = list(executor.map(process_compressed_slc, compressed_slc_infos))
+        results = list(
+            executor.map(
+                process_compressed_slc, compressed_slc_infos, chunksize=chunksize
+            )
+        )
 
     logger.info("Finished creating all compressed SLC products.")
     return results
@@ -1593,24 +2117,23 @@ def extract_footprint(raster_path: Filename, simplify_tolerance: float = 0.01) -
     and Shapely to process the geometry.
 
     """
-    from os import fspath
-
     import shapely
+    import shapely.geometry
     from osgeo import gdal
 
-    # Extract the footprint as WKT string (don't save)
-    wkt = gdal.Footprint(
+    # Extract the footprint as a GeoJSON dict (don't save). Building the geometry
+    # from the already-parsed coordinates skips a WKT serialize/parse round trip
+    feature_collection = gdal.Footprint(
         None,
-        fspath(raster_path),
-        format="WKT",
+        os.fspath(raster_path),
+        format="GeoJSON",
         dstSRS="EPSG:4326",
         simplify=simplify_tolerance,
     )
-
-    # Convert WKT to Shapely geometry, extract exterior, and convert back to Polygon WKT
-    in_multi = shapely.from_wkt(wkt)
+    geom = shapely.geometry.shape(feature_collection["features"][0]["geometry"])
 
     # This may have holes; get the exterior
     # Largest polygon should be first in MultiPolygon returned by GDAL
-    footprint = shapely.Polygon(in_multi.geoms[0].exterior)
+    first_polygon = geom.geoms[0] if hasattr(geom, "geoms") else geom
+    footprint = shapely.Polygon(first_polygon.exterior)
     return footprint.wkt
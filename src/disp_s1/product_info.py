@@ -12,7 +12,7 @@ class ProductInfo:
     name: str
     long_name: str
     description: str
-    fillvalue: DTypeLike
+    fillvalue: float
     dtype: DTypeLike
     attrs: dict[str, str] = field(default_factory=dict)
     keep_bits: int | None = None
@@ -13,6 +13,8 @@ if not os.environ.get("NUMBA_NUM_THREADS"):
 
 from dolphin.phase_link import simulate
 
+from disp_s1.pge_runconfig import RunConfig
+
 NUM_ACQ = 30
 
 
@@ -129,3 +131,43 @@ def scratch_dir(tmp_path_factory):
         pytest.skip("Real data not available")
     tmpdir = tmp_path_factory.mktemp("test_data")
     return _untar_dir(tmpdir, WORKFLOW_SCRATCH_FILE) / "scratch"
+
+
+@pytest.fixture()
+def output_product_kwargs(test_data_dir, scratch_dir):
+    """Get the `create_output_product` inputs for the 20221119_20221213 pair.
+
+    Skips if any of the inputs are missing from the scratch directory.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for `create_output_product`, except the `output_name`.
+    """
+    def _find(pattern: str) -> Path:
+        matches = sorted(scratch_dir.rglob(pattern))
+        if not matches:
+            pytest.skip(f"No {pattern} in the scratch directory")
+        return matches[0]
+
+    cslc_files = sorted(
+        (test_data_dir / "delivery_data_small/input_slcs").glob("t*.h5")
+    )
+    pge_runconfig = RunConfig.from_yaml(
+        test_data_dir / "delivery_data_small/config_files/runconfig_forward.yaml"
+    )
+    return {
+        "unw_filename": _find("20221119_20221213.unw.tif"),
+        "conncomp_filename": _find("20221119_20221213.unw.conncomp*"),
+        "temp_coh_filename": _find("temporal_coherence*.tif"),
+        "ifg_corr_filename": _find("20221119_20221213*.cor*"),
+        "ps_mask_filename": _find("ps_mask_looked*.tif"),
+        "shp_count_filename": _find("shp_count*.tif"),
+        "similarity_filename": _find("similarity*.tif"),
+        "water_mask_filename": None,
+        "pge_runconfig": pge_runconfig,
+        "dolphin_config": pge_runconfig.to_workflow(),
+        "reference_cslc_files": [f for f in cslc_files if "20221119" in f.name],
+        "secondary_cslc_files": [f for f in cslc_files if "20221213" in f.name],
+        "corrections": {},
+    }
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from scipy.interpolate import RegularGridInterpolator
+
+from disp_s1._baselines import _interpolate_data
+
+
+def _interpolate_data_regular_grid(data, shape):
+    # Previous implementation: linear interpolation over `linspace(0, 1, n)` grids
+    orig_coords = [np.linspace(0, 1, s) for s in data.shape]
+    new_coords = [np.linspace(0, 1, s) for s in shape]
+    interp = RegularGridInterpolator(orig_coords, data, method="linear")
+    mesh = np.meshgrid(*new_coords, indexing="xy")
+    return interp(np.array(mesh).T.astype("float32"))
+
+
+@pytest.mark.parametrize(
+    ("in_shape", "out_shape"),
+    [
+        ((5, 7), (40, 33)),
+        ((3, 3), (100, 80)),
+        # Already the requested shape
+        ((11, 13), (11, 13)),
+        # One row in, or out
+        ((1, 6), (1, 30)),
+        ((6, 4), (1, 9)),
+    ],
+)
+def test_interpolate_data(in_shape, out_shape):
+    rng = np.random.default_rng(1234)
+    data = rng.normal(size=in_shape)
+
+    out = _interpolate_data(data, out_shape)
+    assert out.shape == out_shape
+    assert out.dtype == np.float32
+    expected = _interpolate_data_regular_grid(data, out_shape)
+    np.testing.assert_allclose(out, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_interpolate_data_same_shape():
+    data = np.arange(12, dtype=np.float32).reshape(3, 4)
+    out = _interpolate_data(data, (3, 4))
+    assert out is data
+
+
+def test_interpolate_data_one_row_upsampled():
+    # Each output row repeats the only input row
+    data = np.arange(6, dtype=np.float32).reshape(1, 6)
+    out = _interpolate_data(data, (4, 11))
+    assert out.shape == (4, 11)
+    np.testing.assert_allclose(out, np.tile(np.linspace(0, 5, 11), (4, 1)))
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from disp_s1 import browse_image
+
+
+@pytest.mark.parametrize(
+    ("shape", "max_dim_allowed", "expected_shape"),
+    [
+        ((7000, 9000), 2048, (2048, 2633)),
+        ((700, 900), 200, (200, 257)),
+        # Smaller than the max dimension: no block averaging, only zooming
+        ((300, 250), 2048, (2458, 2048)),
+    ],
+)
+def test_make_browse_image_shape(
+    tmp_path, monkeypatch, shape, max_dim_allowed, expected_shape
+):
+    saved = {}
+
+    def _save(arr, *_args):
+        saved["arr"] = arr
+
+    monkeypatch.setattr(browse_image, "_save_to_disk_as_color", _save)
+    arr = np.ones(shape, dtype=np.float32)
+    mask = np.ones(shape, dtype=bool)
+    browse_image.make_browse_image_from_arr(
+        tmp_path / "browse.png", arr, mask, max_dim_allowed=max_dim_allowed
+    )
+    # Same size as zooming the full resolution array
+    assert saved["arr"].shape == expected_shape
+
+
+def test_block_mean():
+    arr = np.arange(20, dtype=np.float32).reshape(4, 5)
+    valid = np.ones(arr.shape, dtype=bool)
+    valid[:2, :2] = False
+    arr[3, 4] = np.nan
+    valid[3, 4] = False
+
+    out = browse_image._block_mean(arr, valid, block=2)
+    expected = np.array(
+        [
+            [np.nan, (2 + 3 + 7 + 8) / 4, (4 + 9) / 2],
+            [(10 + 11 + 15 + 16) / 4, (12 + 13 + 17 + 18) / 4, 14],
+        ]
+    )
+    np.testing.assert_allclose(out, expected)
@@ -1,4 +1,6 @@
 import datetime
+import json
+import os
 import random
 import sys
 import warnings
@@ -6,6 +8,7 @@ from pathlib import Path
 
 import opera_utils
 import pytest
+from pydantic import ValidationError
 
 from disp_s1 import pge_runconfig
 from disp_s1.pge_runconfig import (
@@ -16,6 +19,7 @@ from disp_s1.pge_runconfig import (
     ProductPathGroup,
     RunConfig,
     StaticAncillaryFileGroup,
+    load_algorithm_parameters,
 )
 
 pytestmark = pytest.mark.filterwarnings(
@@ -341,6 +345,102 @@ def test_repeated_compressed_dates():
     assert extra_reference_date is None
 
 
+def test_reference_dates_different_burst_dates():
+    # The bursts share their first date, but not the later ones
+    burst_to_dates = {
+        "IW1": ["20200101", "20200113", "20200125", "20200206"],
+        "IW2": ["20200101", "20200119", "20200131", "20200206"],
+    }
+    files = {
+        swath: [f"OPERA_T042-088905-{swath}_{d}T000000.h5" for d in dates]
+        for swath, dates in burst_to_dates.items()
+    }
+    reference_datetimes = [datetime.datetime(2020, 1, 15)]
+
+    # The lowest burst ID is the template, whichever burst is listed first
+    for cslc_file_list in [
+        files["IW1"] + files["IW2"],
+        files["IW2"] + files["IW1"],
+        opera_utils.sort_files_by_date(files["IW2"] + files["IW1"])[0],
+    ]:
+        output_reference_idx, extra_reference_date = (
+            pge_runconfig._compute_reference_dates(reference_datetimes, cslc_file_list)
+        )
+        assert output_reference_idx == 0
+        assert extra_reference_date == datetime.date(2020, 1, 25)
+
+
+MIXED_NAME_CSLC_LIST = [
+    # Only parseable by `get_dates`
+    "compressed_t087_185680_iw1_20180722_20190412_20190705.h5",
+    "compressed_t087_185680_iw1_20190711_20190711_20191003.h5",
+    "t087_185680_iw1_20200822.h5",
+    # Matched by the `_OPERA_DATE_REGEX` fast path
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20191009T161629Z_20240501T010610Z_S1A_VV_v1.1.h5",
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20200804T161629Z_20240501T010610Z_S1A_VV_v1.1.h5",
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20200810T161548Z_20240501T030849Z_S1B_VV_v1.1.h5",
+]
+
+
+@pytest.mark.parametrize("name", MIXED_NAME_CSLC_LIST)
+def test_get_first_date(name):
+    uses_fast_path = pge_runconfig._OPERA_DATE_REGEX.search(name) is not None
+    assert uses_fast_path == name.startswith("OPERA")
+    assert pge_runconfig._get_first_date(name) == opera_utils.get_dates(name)[0].date()
+
+
+def test_reference_dates_mixed_names():
+    cslc_file_list = MIXED_NAME_CSLC_LIST.copy()
+    random.shuffle(cslc_file_list)
+
+    reference_datetimes = [
+        datetime.datetime(2019, 7, 11),
+        datetime.datetime(2020, 8, 1),
+    ]
+    # Sorted first dates:
+    # 2018-07-22 (compressed), 2019-07-11 (compressed), 2019-10-09, 2020-08-04, ...
+    # - 2019-07-11 lands on the second compressed SLC: output index 1
+    # - 2020-08-01 is first followed by the 2020-08-04 CSLC: extra reference date
+    output_reference_idx, extra_reference_date = pge_runconfig._compute_reference_dates(
+        reference_datetimes, cslc_file_list
+    )
+    assert output_reference_idx == 1
+    assert extra_reference_date == datetime.date(2020, 8, 4)
+
+
+# Pairs of compressed and regular CSLCs which share their first date
+TIED_DATE_CSLC_LIST = [
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20200705T161629Z_20240501T010610Z_S1A_VV_v1.1.h5",
+    "compressed_t087_185680_iw1_20200717_20200412_20200705.h5",
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20200717T161629Z_20240501T010610Z_S1A_VV_v1.1.h5",
+    "OPERA_L2_COMPRESSED-CSLC-S1_T087-185680-IW1_20200729T000000Z_20200412T000000Z_20200717T000000Z_20240501T000000Z_VV_v1.0.h5",
+    "OPERA_L2_CSLC-S1_T087-185680-IW1_20200729T161629Z_20240501T010610Z_S1A_VV_v1.1.h5",
+]
+
+
+@pytest.mark.parametrize(
+    "cslc_file_list",
+    [MIXED_NAME_CSLC_LIST, TIED_DATE_CSLC_LIST, list(reversed(TIED_DATE_CSLC_LIST))],
+)
+def test_sort_names_by_date(cslc_file_list):
+    names, input_dates = pge_runconfig._sort_names_by_date(cslc_file_list)
+    expected_files, expected_dates = opera_utils.sort_files_by_date(cslc_file_list)
+    assert names == [Path(f).name for f in expected_files]
+    assert input_dates == [d[0].date() for d in expected_dates]
+
+
+def test_reference_dates_tied_compressed():
+    cslc_file_list = TIED_DATE_CSLC_LIST.copy()
+    random.shuffle(cslc_file_list)
+    # The compressed SLC sorts before the CSLC from the same date, regardless of
+    # the file name prefix, so the reference date lands on it.
+    output_reference_idx, extra_reference_date = pge_runconfig._compute_reference_dates(
+        [datetime.datetime(2020, 7, 17)], cslc_file_list
+    )
+    assert output_reference_idx == 1
+    assert extra_reference_date is None
+
+
 @pytest.fixture
 def overrides_file():
     return (
@@ -359,3 +459,101 @@ def test_algorithm_overrides(overrides_file, algorithm_parameters_file):
         orig_params, 1234
     )  # frame id with no override
     assert p4.unwrap_options == orig_params.unwrap_options
+
+
+def _write_overrides(
+    tmp_path, frame_overrides: dict, name: str = "overrides.json"
+) -> Path:
+    # (Loaded overrides are cached by path/mtime, so use a new name for each file)
+    override_file = tmp_path / name
+    override_file.write_text(json.dumps({"1234": frame_overrides}))
+    return override_file
+
+
+def test_algorithm_overrides_none(tmp_path, algorithm_parameters_file):
+    orig_params = AlgorithmParameters.from_yaml(algorithm_parameters_file)
+    orig_params.algorithm_parameters_overrides_json = _write_overrides(tmp_path, {})
+
+    new_params = pge_runconfig._override_parameters(orig_params, 1234)
+    assert new_params.algorithm_parameters_overrides_json is None
+    assert new_params.unwrap_options == orig_params.unwrap_options
+    # The result must not share nested models with the (possibly cached) input
+    assert new_params.unwrap_options is not orig_params.unwrap_options
+    new_params.unwrap_options.n_parallel_jobs += 1
+    assert new_params.unwrap_options != orig_params.unwrap_options
+
+
+def test_algorithm_overrides_sub_models(tmp_path, algorithm_parameters_file):
+    orig_params = AlgorithmParameters.from_yaml(algorithm_parameters_file)
+    orig_params.algorithm_parameters_overrides_json = _write_overrides(
+        tmp_path,
+        {
+            "unwrap_options": {"unwrap_method": "spurt"},
+            "phase_linking": {"ministack_size": 7},
+        },
+    )
+
+    new_params = pge_runconfig._override_parameters(orig_params, 1234)
+    assert new_params.algorithm_parameters_overrides_json is None
+    assert new_params.unwrap_options.unwrap_method == "spurt"
+    assert new_params.phase_linking.ministack_size == 7
+    # Other fields of the touched sub-models are kept
+    assert (
+        new_params.unwrap_options.n_parallel_jobs
+        == orig_params.unwrap_options.n_parallel_jobs
+    )
+    # Untouched sub-models are equal, but not shared
+    assert new_params.ps_options == orig_params.ps_options
+    assert new_params.ps_options is not orig_params.ps_options
+    # The input is unchanged
+    assert orig_params.unwrap_options.unwrap_method != "spurt"
+    # The updated sub-models are still validated
+    orig_params.algorithm_parameters_overrides_json = _write_overrides(
+        tmp_path,
+        {"unwrap_options": {"unwrap_method": "not-a-method"}},
+        name="invalid-overrides.json",
+    )
+    with pytest.raises(ValidationError):
+        pge_runconfig._override_parameters(orig_params, 1234)
+
+
+def test_algorithm_overrides_top_level(tmp_path, algorithm_parameters_file):
+    orig_params = AlgorithmParameters.from_yaml(algorithm_parameters_file)
+    orig_params.algorithm_parameters_overrides_json = _write_overrides(
+        tmp_path,
+        {
+            "spatial_wavelength_cutoff": 12345.0,
+            "unwrap_options": {"unwrap_method": "spurt"},
+        },
+    )
+
+    new_params = pge_runconfig._override_parameters(orig_params, 1234)
+    assert new_params.algorithm_parameters_overrides_json is None
+    assert new_params.spatial_wavelength_cutoff == 12345.0
+    assert new_params.unwrap_options.unwrap_method == "spurt"
+    assert new_params.ps_options == orig_params.ps_options
+    assert orig_params.spatial_wavelength_cutoff != 12345.0
+
+    orig_params.algorithm_parameters_overrides_json = _write_overrides(
+        tmp_path,
+        {"spatial_wavelength_cutoff": "not-a-number"},
+        name="invalid-overrides.json",
+    )
+    with pytest.raises(ValidationError):
+        pge_runconfig._override_parameters(orig_params, 1234)
+
+
+def test_load_algorithm_parameters(algorithm_parameters_file):
+    params = load_algorithm_parameters(algorithm_parameters_file)
+    assert params == AlgorithmParameters.from_yaml(algorithm_parameters_file)
+    # Repeated loads of an unchanged file are cached
+    assert load_algorithm_parameters(str(algorithm_parameters_file)) is params
+
+    # Modifying the file on disk triggers a reload
+    AlgorithmParameters(spatial_wavelength_cutoff=12345.0).to_yaml(
+        algorithm_parameters_file
+    )
+    mtime = algorithm_parameters_file.stat().st_mtime
+    os.utime(algorithm_parameters_file, (mtime + 10, mtime + 10))
+    new_params = load_algorithm_parameters(algorithm_parameters_file)
+    assert new_params.spatial_wavelength_cutoff == 12345.0
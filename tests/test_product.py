@@ -1,7 +1,13 @@
+import datetime
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import h5netcdf
 import h5py
+import numpy as np
 import pytest
+from dolphin import io
 
 from disp_s1 import product
 from disp_s1.pge_runconfig import RunConfig
@@ -60,6 +66,243 @@ def test_create_output_product(
     )
 
 
+# Shapely runtime warning
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_create_output_product_metadata_as_attrs(tmp_path, output_product_kwargs):
+    output_name = tmp_path / "20221119_20221213.nc"
+    product.create_output_product(
+        output_name=output_name, store_metadata_as_attrs=True, **output_product_kwargs
+    )
+    pge_runconfig = output_product_kwargs["pge_runconfig"]
+
+    with h5py.File(output_name) as hf:
+        assert "displacement" in hf
+        identification = hf[product.IDENTIFICATION_GROUP_NAME]
+        assert "frame_id" not in identification
+        assert (
+            identification.attrs["frame_id"] == pge_runconfig.input_file_group.frame_id
+        )
+        assert identification.attrs["frame_id_description"] == (
+            "ID number of the processed frame"
+        )
+        metadata = hf[product.METADATA_GROUP_NAME]
+        assert "disp_s1_software_version" not in metadata
+        assert "disp_s1_software_version" in metadata.attrs
+        assert "disp_s1_software_version_description" in metadata.attrs
+
+
+def test_set_scalar_attr(tmp_path):
+    output_name = tmp_path / "test.nc"
+    with h5netcdf.File(output_name, "w") as f:
+        group = f.create_group("identification")
+        product._set_scalar_attr(
+            group=group,
+            name="frame_id",
+            dimensions=(),
+            data=11114,
+            fillvalue=None,
+            description="ID number of the processed frame",
+            attrs={"units": "unitless"},
+        )
+        product._set_scalar_attr(
+            group=group,
+            name="processing_facility",
+            dimensions=(),
+            data="NASA Jet Propulsion Laboratory on AWS",
+            fillvalue=None,
+            description="Product processing facility",
+            long_name="Processing facility",
+        )
+
+    with h5py.File(output_name) as hf:
+        group = hf["identification"]
+        assert len(group.keys()) == 0
+        assert group.attrs["frame_id"] == 11114
+        assert group.attrs["frame_id_description"] == "ID number of the processed frame"
+        assert group.attrs["frame_id_units"] == "unitless"
+        assert group.attrs["processing_facility"] == (
+            "NASA Jet Propulsion Laboratory on AWS"
+        )
+        assert group.attrs["processing_facility_long_name"] == "Processing facility"
+
+
+# Shapely runtime warning
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_create_output_product_direct_chunks(
+    tmp_path, output_product_kwargs, monkeypatch
+):
+    # Write the same product through HDF5's filter pipeline, then directly
+    outputs = {}
+    for direct in ["0", "1"]:
+        monkeypatch.setenv(product.DIRECT_CHUNK_ENV_VAR, direct)
+        outputs[direct] = tmp_path / f"direct_{direct}" / "20221119_20221213.nc"
+        outputs[direct].parent.mkdir()
+        product.create_output_product(
+            output_name=outputs[direct], **output_product_kwargs
+        )
+
+    with (
+        h5netcdf.File(outputs["0"], "r") as expected,
+        h5netcdf.File(outputs["1"], "r") as actual,
+    ):
+        rasters = [n for n, v in expected.variables.items() if v.ndim == 2]
+        assert "displacement" in rasters
+        for name in rasters:
+            np.testing.assert_array_equal(actual[name][()], expected[name][()])
+            assert actual[name].attrs.keys() == expected[name].attrs.keys()
+
+    netCDF4 = pytest.importorskip("netCDF4")
+    with (
+        netCDF4.Dataset(outputs["0"]) as expected,
+        netCDF4.Dataset(outputs["1"]) as actual,
+    ):
+        for name in rasters:
+            np.testing.assert_array_equal(
+                actual[name][:].filled(0), expected[name][:].filled(0)
+            )
+            np.testing.assert_array_equal(
+                np.ma.getmaskarray(actual[name][:]),
+                np.ma.getmaskarray(expected[name][:]),
+            )
+
+
+@pytest.mark.parametrize("fraction_masked", [0.0, 0.5, 1.0])
+def test_average_valid_pixels(fraction_masked):
+    rng = np.random.default_rng(1234)
+    data = rng.uniform(size=(50, 60)).astype(np.float32)
+    mask = rng.uniform(size=data.shape) < fraction_masked
+    arr = np.ma.MaskedArray(data, mask=mask)
+
+    average = product._average_valid_pixels(arr, ~np.ma.getmaskarray(arr))
+    assert isinstance(average, float)
+    # Matches the masked mean as stored in the product: for an all-nodata layer,
+    # it is the `masked` constant, which is written as its 0.0 data value
+    np.testing.assert_allclose(average, np.asarray(arr.mean()), rtol=1e-6)
+    if fraction_masked == 1.0:
+        assert average == 0.0
+
+
+def test_extract_cslc_metadata_extra_digits(tmp_path):
+    cslc_file = tmp_path / "cslc.h5"
+    with h5py.File(cslc_file, "w") as hf:
+        # More fractional digits than `strptime`'s %f accepts
+        hf["/identification/zero_doppler_start_time"] = "2022-12-28 16:16:51.123456789"
+        hf["/identification/zero_doppler_end_time"] = b"2022-12-28 16:16:54.5"
+        hf["/identification/orbit_pass_direction"] = b"ascending"
+        hf["/quality_assurance/orbit_information/orbit_type"] = "precise orbit file"
+        hf["/metadata/processing_information/input_burst_metadata/wavelength"] = 0.055
+
+    meta = product._extract_cslc_metadata(cslc_file)
+    assert meta.zero_doppler_start_time == datetime.datetime(
+        2022, 12, 28, 16, 16, 51, 123456
+    )
+    assert meta.zero_doppler_end_time == datetime.datetime(
+        2022, 12, 28, 16, 16, 54, 500000
+    )
+    assert meta.orbit_direction == "ascending"
+    assert meta.orbit_type == "precise orbit file"
+    assert meta.radar_wavelength == 0.055
+
+
+@pytest.mark.parametrize("direct_chunks", [True, False])
+@pytest.mark.parametrize("dtype", [np.float32, np.complex64])
+@pytest.mark.parametrize("shuffle", [True, False])
+def test_write_raster_by_strips(tmp_path, monkeypatch, dtype, shuffle, direct_chunks):
+    monkeypatch.setenv(product.DIRECT_CHUNK_ENV_VAR, "1" if direct_chunks else "0")
+    # Neither dimension is a multiple of the chunk size, so the edge chunks
+    # written with `write_direct_chunk` need padding
+    rows, cols = 2 * product.CHUNK_SHAPE[0] + 45, product.CHUNK_SHAPE[1] + 13
+    rng = np.random.default_rng(1234)
+    data = rng.normal(size=(rows, cols)).astype(dtype)
+    if np.iscomplexobj(data):
+        data += 1j * rng.normal(size=(rows, cols)).astype(np.float32)
+    raster_file = tmp_path / "data.tif"
+    io.write_arr(arr=data, output_name=raster_file)
+
+    output_name = tmp_path / "test.h5"
+    with h5netcdf.File(output_name, "w", invalid_netcdf=True) as f:
+        f.dimensions = {"y": rows, "x": cols}
+        dset = f.create_variable(
+            "data",
+            dimensions=("y", "x"),
+            dtype=dtype,
+            chunks=product.CHUNK_SHAPE,
+            compression="gzip",
+            compression_opts=4,
+            shuffle=shuffle,
+        )
+        written = []
+        write_strip = product._write_strip_direct_chunks
+        monkeypatch.setattr(
+            product,
+            "_write_strip_direct_chunks",
+            lambda *args: written.append(write_strip(*args)),
+        )
+        product._write_raster_by_strips(dset, raster_file, dtype=dtype)
+
+    # Only the opted-in path bypasses HDF5's filter pipeline
+    assert bool(written) == direct_chunks
+    with h5netcdf.File(output_name, "r") as f:
+        np.testing.assert_array_equal(f["data"][()], data)
+
+
+def test_direct_chunk_writes_enabled(monkeypatch):
+    monkeypatch.delenv(product.DIRECT_CHUNK_ENV_VAR, raising=False)
+    assert not product._direct_chunk_writes_enabled()
+    monkeypatch.setenv(product.DIRECT_CHUNK_ENV_VAR, "TRUE")
+    assert product._direct_chunk_writes_enabled()
+    monkeypatch.setenv(product.DIRECT_CHUNK_ENV_VAR, "0")
+    assert not product._direct_chunk_writes_enabled()
+
+
+def test_write_strip_direct_chunks_dtype_mismatch(tmp_path):
+    with h5py.File(tmp_path / "test.h5", "w") as hf:
+        h5ds = hf.create_dataset(
+            "data",
+            shape=(10, 10),
+            dtype=np.complex64,
+            chunks=(10, 10),
+            compression="gzip",
+        )
+        with (
+            ThreadPoolExecutor(max_workers=1) as executor,
+            pytest.raises(ValueError, match="dtype"),
+        ):
+            product._write_strip_direct_chunks(
+                h5ds, 0, np.zeros((10, 10), dtype=np.float32), 4, executor
+            )
+
+
+def test_compressed_slc_hdf5_options_default(monkeypatch):
+    monkeypatch.delenv(product.COMPRESSION_ENV_VAR, raising=False)
+    assert product._get_compressed_slc_hdf5_options() == product.HDF5_OPTS
+    monkeypatch.setenv(product.COMPRESSION_ENV_VAR, "GZIP")
+    assert product._get_compressed_slc_hdf5_options() == product.HDF5_OPTS
+
+
+def test_compressed_slc_hdf5_options_invalid(monkeypatch):
+    monkeypatch.setenv(product.COMPRESSION_ENV_VAR, "lzf")
+    with pytest.raises(ValueError, match=product.COMPRESSION_ENV_VAR):
+        product._get_compressed_slc_hdf5_options()
+
+
+def test_compressed_slc_hdf5_options_zstd(monkeypatch):
+    hdf5plugin = pytest.importorskip("hdf5plugin")
+    monkeypatch.setenv(product.COMPRESSION_ENV_VAR, "zstd")
+    options = product._get_compressed_slc_hdf5_options()
+    assert options["compression"] == hdf5plugin.Zstd().filter_id
+    assert options["shuffle"]
+    assert options["chunks"] == product.HDF5_OPTS["chunks"]
+
+
+def test_compressed_slc_hdf5_options_zstd_missing_plugin(monkeypatch, caplog):
+    monkeypatch.setenv(product.COMPRESSION_ENV_VAR, "zstd")
+    # A `None` entry in `sys.modules` makes `import hdf5plugin` raise ImportError
+    monkeypatch.setitem(sys.modules, "hdf5plugin", None)
+    assert product._get_compressed_slc_hdf5_options() == product.HDF5_OPTS
+    assert "falling back to gzip" in caplog.text
+
+
 def test_create_compressed_slc(tmp_path):
     # OPERA_L2_CSLC-S1_T087-185683-IW2_20221228T161651Z_20240504T181714Z_S1A_VV_v1.1.h5
     # compressed_20221228_20230101_20230113.tif
@@ -82,3 +325,9 @@ def test_create_compressed_slc(tmp_path):
         assert "/metadata/orbit" in hf
         assert "/identification/zero_doppler_start_time" in hf
         assert "/metadata/processing_information/input_burst_metadata/wavelength" in hf
+        # Creation order isn't tracked for the groups or datasets
+        for name in ["/", "/data", "/data/VV"]:
+            plist = hf[name].id.get_create_plist()
+            assert plist.get_attr_creation_order() == 0
+            if isinstance(hf[name], h5py.Group):
+                assert plist.get_link_creation_order() == 0